@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Export the stars of a region of chunks to a columnar catalog, in parallel.
+
+Example (100x100x100 chunks around the origin):
+    python export_region.py --seed lakentio2 --from -50 -50 -50 --to 50 50 50 --out catalog/
+
+Re-running the same command resumes an interrupted export.
+"""
+
+import sys
+import os
+import argparse
+import json
+import time
+import multiprocessing
+
+# Add the 'src' directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description="Universe Engine region exporter")
+    parser.add_argument('--seed', help='Universe seed (defaults to the configured active seed)')
+    parser.add_argument('--from', dest='lo', type=int, nargs=3, required=True, metavar=('CX', 'CY', 'CZ'), help='First chunk (inclusive)')
+    parser.add_argument('--to', dest='hi', type=int, nargs=3, required=True, metavar=('CX', 'CY', 'CZ'), help='Last chunk (exclusive)')
+    parser.add_argument('--out', '-o', required=True, help='Catalog directory')
+    parser.add_argument('--workers', '-j', type=int, default=os.cpu_count(), help='Worker processes (default: all cores)')
+    parser.add_argument('--partition', type=int, default=8, help='Chunks per partition along each axis')
+    args = parser.parse_args()
+    if args.partition < 1:
+        parser.error("--partition must be at least 1")
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1")
+    return args
+
+if __name__ == "__main__":
+    args = _parse_args()
+
+    import core.engine as engine
+    import core.catalog as catalog
+    import utils.logger
+
+    utils.logger.configure_logging()
+
+    seed = args.seed or engine.get_active_seed()
+    lo, hi = tuple(args.lo), tuple(args.hi)
+    if any(h <= l for l, h in zip(lo, hi)):
+        sys.exit("--to must be greater than --from on every axis")
+
+    try:
+        done = set(catalog.open_catalog(args.out, seed, lo, hi, args.partition))
+    except ValueError as e:
+        sys.exit(str(e))
+
+    todo = [p for p in catalog.partition_keys(lo, hi, args.partition) if catalog.partition_name(p) not in done]
+    total_parts = len(done) + len(todo)
+    print(f"Exporting {len(todo)} of {total_parts} partitions ({len(done)} already done) with {args.workers} workers")
+
+    started = time.time()
+    chunks = stars = finished = 0
+    index_path = os.path.join(args.out, 'index.jsonl')
+    with multiprocessing.Pool(args.workers, initializer=catalog.init_worker, initargs=(seed,)) as pool, \
+            open(index_path, 'a', encoding='utf-8') as index:
+        jobs = [(args.out, p, hi, args.partition) for p in todo]
+        # Workers write their partitions themselves; only small index entries come back
+        for entry in pool.imap_unordered(catalog.export_partition_job, jobs):
+            index.write(json.dumps(entry) + "\n")
+            index.flush()
+            finished += 1
+            chunks += entry['chunks']
+            stars += entry['stars']
+            elapsed = time.time() - started
+            print(f"\r{len(done) + finished}/{total_parts} partitions, {chunks / elapsed:,.0f} chunks/s, {stars:,} stars", end='', flush=True)
+
+    elapsed = time.time() - started
+    print(f"\nDone: {chunks:,} chunks, {stars:,} stars in {elapsed:.1f}s ({chunks / max(elapsed, 1e-9):,.0f} chunks/s)")
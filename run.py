@@ -13,6 +13,8 @@ def _parse_args():
     parser.add_argument('--save', '-s', help='Save on start with given name')
     parser.add_argument('--fps', type=int, help='Override target FPS')
     parser.add_argument('--profile', action='store_true', help='Enable basic profiling/logging')
+    parser.add_argument('--pacing', choices=['uncapped', 'capped', 'vsync', 'lowpower'], help='Frame pacing mode')
+    parser.add_argument('--adaptive', action='store_true', default=None, help='Adjust quality at runtime to hold the target FPS')
     parser.add_argument("--version", action="version", version="Universe Engine " + __import__('src').version)
     parser.add_argument("--dev", action="store_true", help="open the developer page on GitHub")
     return parser.parse_args()
@@ -25,4 +27,4 @@ if __name__ == "__main__":
 
     from src.main import main
 
-    main(load=args.load, save_on_start=args.save, fps=args.fps, profile=args.profile)
\ No newline at end of file
+    main(load=args.load, save_on_start=args.save, fps=args.fps, profile=args.profile, adaptive=args.adaptive, pacing=args.pacing)
\ No newline at end of file
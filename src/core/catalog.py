@@ -0,0 +1,153 @@
+"""Columnar on-disk star catalog for offline region exports.
+
+A catalog is a directory:
+
+    catalog.json          parameters (seed, region, partition size, byte order)
+    index.jsonl           one line per completed partition
+    parts/p_X_Y_Z/        one partition = a block of PARTITION^3 chunks
+        chunks.i32        chunk keys, 3 int32 per chunk (cx, cy, cz)
+        offsets.u32       index of each chunk's first star, plus a final end offset
+        lx.f32 ly.f32 lz.f32 size.f32
+                          star columns: float32 offsets inside the chunk and size
+
+Star values are exactly the float32 values `core.engine.generate_chunk`
+produces for the same seed; the star ID of row `i` of chunk `k` is
+`core.engine.star_id(k, i - offsets[k])`.
+
+Partitions are written to a temporary directory and renamed when complete,
+and only then added to the index, so an interrupted export can be resumed.
+"""
+import json
+import os
+import shutil
+import sys
+from array import array
+from typing import Dict, Iterator, List, Tuple
+
+import core.engine as engine
+import utils.config
+
+CATALOG_VERSION = 1
+COLUMNS = ('lx', 'ly', 'lz', 'size')
+
+
+def partition_keys(lo: Tuple[int, int, int], hi: Tuple[int, int, int], partition: int) -> Iterator[Tuple[int, int, int]]:
+    """Yield the partition origins (chunk coords) covering [lo, hi)."""
+    for px in range(lo[0], hi[0], partition):
+        for py in range(lo[1], hi[1], partition):
+            for pz in range(lo[2], hi[2], partition):
+                yield (px, py, pz)
+
+
+def partition_name(origin: Tuple[int, int, int]) -> str:
+    return f"p_{origin[0]}_{origin[1]}_{origin[2]}"
+
+
+def _write(path: str, values: array) -> None:
+    with open(path, 'wb') as f:
+        values.tofile(f)
+
+
+def init_worker(seed: str) -> None:
+    """Pool initializer: make generation in this process use `seed`."""
+    utils.config.USE_CUSTOM_SEED = True
+    utils.config.CUSTOM_SEED = seed
+
+
+def export_partition(out_dir: str, origin: Tuple[int, int, int], hi: Tuple[int, int, int], partition: int) -> Dict:
+    """Generate and write one partition. Returns its index entry."""
+    name = partition_name(origin)
+    final_dir = os.path.join(out_dir, 'parts', name)
+    tmp_dir = final_dir + '.tmp'
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    chunk_keys = array('i')
+    offsets = array('I', [0])
+    columns = {c: array('f') for c in COLUMNS}
+    for cx in range(origin[0], min(origin[0] + partition, hi[0])):
+        for cy in range(origin[1], min(origin[1] + partition, hi[1])):
+            for cz in range(origin[2], min(origin[2] + partition, hi[2])):
+                chunk = engine.generate_chunk(cx, cy, cz)
+                chunk_keys.extend((cx, cy, cz))
+                # coords are interleaved (lx, ly, lz, size): split them into columns
+                for i, column in enumerate(COLUMNS):
+                    columns[column].extend(chunk.coords[i::4])
+                offsets.append(offsets[-1] + len(chunk))
+
+    _write(os.path.join(tmp_dir, 'chunks.i32'), chunk_keys)
+    _write(os.path.join(tmp_dir, 'offsets.u32'), offsets)
+    for column, values in columns.items():
+        _write(os.path.join(tmp_dir, f'{column}.f32'), values)
+
+    shutil.rmtree(final_dir, ignore_errors=True)
+    os.rename(tmp_dir, final_dir)
+    return {'part': name, 'origin': list(origin), 'chunks': len(offsets) - 1, 'stars': offsets[-1]}
+
+
+def export_partition_job(job: Tuple) -> Dict:
+    """`export_partition` taking its arguments as one tuple (for `Pool.imap_unordered`)."""
+    return export_partition(*job)
+
+
+def open_catalog(out_dir: str, seed: str, lo, hi, partition: int) -> List[str]:
+    """Create the catalog directory or validate an existing one.
+
+    Returns the names of partitions already completed (for resuming).
+    Raises ValueError if the directory holds a catalog with other parameters.
+    """
+    meta = {
+        'version': CATALOG_VERSION,
+        'seed': seed,
+        'chunk_size': utils.config.CHUNK_SIZE,
+        'stars_per_chunk': list(utils.config.STARS_PER_CHUNK),
+        'from': list(lo),
+        'to': list(hi),
+        'partition': partition,
+        'byteorder': sys.byteorder,
+        'columns': list(COLUMNS),
+    }
+    meta_path = os.path.join(out_dir, 'catalog.json')
+    os.makedirs(os.path.join(out_dir, 'parts'), exist_ok=True)
+    if os.path.exists(meta_path):
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            existing = json.load(f)
+        if existing != meta:
+            raise ValueError(f"{out_dir} already holds a catalog with different parameters")
+    else:
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+
+    done = []
+    index_path = os.path.join(out_dir, 'index.jsonl')
+    if os.path.exists(index_path):
+        with open(index_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        for line in content.splitlines():
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # partial last line from an interrupted run
+            if os.path.isdir(os.path.join(out_dir, 'parts', entry['part'])):
+                done.append(entry['part'])
+        if content and not content.endswith('\n'):
+            # Terminate the partial line so new entries start on their own line
+            with open(index_path, 'a', encoding='utf-8') as f:
+                f.write('\n')
+    return done
+
+
+def read_partition(out_dir: str, name: str) -> Dict[str, array]:
+    """Load one partition's columns as arrays (keys: chunks, offsets, lx, ly, lz, size)."""
+    with open(os.path.join(out_dir, 'catalog.json'), 'r', encoding='utf-8') as f:
+        meta = json.load(f)
+    part_dir = os.path.join(out_dir, 'parts', name)
+    result = {}
+    for column, typecode, filename in [('chunks', 'i', 'chunks.i32'), ('offsets', 'I', 'offsets.u32')] + [(c, 'f', f'{c}.f32') for c in COLUMNS]:
+        values = array(typecode)
+        with open(os.path.join(part_dir, filename), 'rb') as f:
+            values.frombytes(f.read())
+        if meta['byteorder'] != sys.byteorder:
+            values.byteswap()
+        result[column] = values
+    return result
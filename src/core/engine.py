@@ -1,18 +1,95 @@
-import pygame
 import math
 import hashlib
 import random
 import utils.config
-import utils.logger
+import logging
 import utils.save_manager as save_manager
+from core.scheduler import ChunkScheduler
 import time
+from array import array
+from functools import lru_cache
 
-logger = utils.logger.get_logger()
-from typing import List, Tuple, Optional
+# Core only looks up the logger; handlers are set up by the entry points (utils.logger.configure_logging)
+logger = logging.getLogger('universe')
+from typing import Dict, List, Tuple, Optional
+
+# This module must not import pygame: it is used by tools and servers without SDL.
+# The pygame frontend lives in `rendering` and `main`.
 
 stars_cache = {}
 # Set of chunk keys currently considered "visible" (with hysteresis)
 visible_chunk_keys = set()
+# Callbacks notified when chunks enter or leave stars_cache: (on_loaded, on_evicted)
+chunk_listeners = []
+# Missing chunks wait here and are generated under a per-frame time budget
+chunk_scheduler = ChunkScheduler()
+# Floating origin: chunk whose corner is (0, 0, 0) in the render frame.
+# Visible stars are expressed relative to it so projection stays precise far from the world origin.
+render_origin = (0, 0, 0)
+
+class StarChunk:
+    """Stars of one chunk stored compactly.
+
+    `coords` holds float32 values interleaved as (lx, ly, lz, size) per star,
+    where lx/ly/lz are offsets inside the chunk (0..CHUNK_SIZE). World
+    positions are `key * CHUNK_SIZE + offset`. Everything else about a star
+    is derived on demand by `get_star_details`.
+    """
+    __slots__ = ('key', 'coords')
+
+    def __init__(self, key: Tuple[int, int, int]):
+        self.key = key
+        self.coords = array('f')
+
+    def __len__(self):
+        return len(self.coords) // 4
+
+    def local(self, i: int) -> Tuple[float, float, float, float]:
+        """Return (lx, ly, lz, size) of star `i`."""
+        j = i * 4
+        c = self.coords
+        return c[j], c[j + 1], c[j + 2], c[j + 3]
+
+    def nbytes(self) -> int:
+        """Approximate memory used by the star data."""
+        return self.coords.itemsize * len(self.coords)
+
+# Star IDs: (chunk code << STAR_INDEX_BITS) | index inside the chunk
+STAR_INDEX_BITS = 12
+# Stars per chunk must stay below this, or indexes would spill into the chunk code
+MAX_STARS_PER_CHUNK = 1 << STAR_INDEX_BITS
+
+def _zigzag(n: int) -> int:
+    return n * 2 if n >= 0 else -n * 2 - 1
+
+def _unzigzag(z: int) -> int:
+    return z // 2 if z % 2 == 0 else -(z + 1) // 2
+
+def _pair(a: int, b: int) -> int:
+    # Szudzik pairing of two non-negative integers
+    return a * a + a + b if a >= b else b * b + a
+
+def _unpair(z: int) -> Tuple[int, int]:
+    s = math.isqrt(z)
+    r = z - s * s
+    return (r, s) if r < s else (s, r - s)
+
+def chunk_code(key: Tuple[int, int, int]) -> int:
+    """Return a unique non-negative integer for a chunk key (small near the origin)."""
+    cx, cy, cz = key
+    return _pair(_pair(_zigzag(cx), _zigzag(cy)), _zigzag(cz))
+
+def star_id(key: Tuple[int, int, int], index: int) -> int:
+    """Return the stable ID of star `index` in chunk `key`."""
+    if not 0 <= index < MAX_STARS_PER_CHUNK:
+        raise ValueError(f"Star index {index} does not fit in {STAR_INDEX_BITS} bits")
+    return (chunk_code(key) << STAR_INDEX_BITS) | index
+
+def split_star_id(sid: int) -> Tuple[Tuple[int, int, int], int]:
+    """Return (chunk key, index) for a star ID."""
+    xy, z = _unpair(sid >> STAR_INDEX_BITS)
+    x, y = _unpair(xy)
+    return (_unzigzag(x), _unzigzag(y), _unzigzag(z)), sid & ((1 << STAR_INDEX_BITS) - 1)
 
 def get_active_seed():
     """Return the active seed based on configuration."""
@@ -32,57 +109,216 @@ def coord_seed(*coords: int) -> int:
     # Convert to a 64-bit integer using the first 8 bytes
     return int.from_bytes(hash_bytes[:8], byteorder='big', signed=False)
 
-def initialize_pygame():
-    """Initialize Pygame and return the screen and clock."""
-    pygame.init()
-    screen = pygame.display.set_mode((utils.config.WIDTH, utils.config.HEIGHT))
-    pygame.display.set_caption("Universe Engine - Procedural Space Explorer")
-    clock = pygame.time.Clock()
-    return screen, clock
-
 def generate_star_name(rng: random.Random) -> str:
     """Generate a short unique-looking name for a star."""
     letters = ''.join(rng.choices("ABCDEFGHIJKLMNOPQRSTUVWXYZ", k=3))
     numbers = rng.randint(1000, 9999)
     return f"{letters}-{numbers}"
 
-def generate_chunk(cx: int, cy: int, cz: int):
-    """Create stars for a given chunk (chunk coordinates, not world coords)."""
+def generate_chunk(cx: int, cy: int, cz: int) -> StarChunk:
+    """Create stars for a given chunk (chunk coordinates, not world coords).
+
+    Only what rendering needs (position and size) is generated here.
+    """
+    if utils.config.STARS_PER_CHUNK[1] > MAX_STARS_PER_CHUNK:
+        raise ValueError(f"STARS_PER_CHUNK allows {utils.config.STARS_PER_CHUNK[1]} stars, "
+                         f"but star IDs hold at most {MAX_STARS_PER_CHUNK} per chunk (STAR_INDEX_BITS={STAR_INDEX_BITS})")
     rng = random.Random(coord_seed(cx, cy, cz))
     n_stars = rng.randint(*utils.config.STARS_PER_CHUNK)
-    stars = []
+    chunk = StarChunk((cx, cy, cz))
     for _ in range(n_stars):
         lx = rng.uniform(0, utils.config.CHUNK_SIZE)
         ly = rng.uniform(0, utils.config.CHUNK_SIZE)
         lz = rng.uniform(0, utils.config.CHUNK_SIZE)
         size = rng.random() * 1.5 + 0.5
-        name = generate_star_name(rng)
-        stars.append((cx * utils.config.CHUNK_SIZE + lx, cy * utils.config.CHUNK_SIZE + ly, cz * utils.config.CHUNK_SIZE + lz, size, name))
-    return stars
+        chunk.coords.extend((lx, ly, lz, size))
+    return chunk
 
-def update_visible_stars(cam_pos: List[float], cam_rot: List[float] = None) -> List[Tuple]:
-    """Update the list of visible stars - optimized version.
+# Spectral classes: (class, relative weight, temperature range in K, display colour)
+SPECTRAL_CLASSES = [
+    ('O', 1, (30000, 50000), (155, 176, 255)),
+    ('B', 3, (10000, 30000), (170, 191, 255)),
+    ('A', 6, (7500, 10000), (202, 215, 255)),
+    ('F', 10, (6000, 7500), (248, 247, 255)),
+    ('G', 15, (5200, 6000), (255, 244, 234)),
+    ('K', 25, (3700, 5200), (255, 210, 161)),
+    ('M', 40, (2400, 3700), (255, 204, 111)),
+]
+PLANET_KINDS = ['rocky', 'gas giant', 'ice giant', 'ocean', 'lava']
+
+@lru_cache(maxsize=4096)
+def _star_details(seed: str, sid: int) -> Dict:
+    # Per-star substream: independent of the chunk stream and of every other star
+    key, index = split_star_id(sid)
+    rng = random.Random(coord_seed(*key, index))
+    name = generate_star_name(rng)
+    spectral, _, (t_min, t_max), color = rng.choices(SPECTRAL_CLASSES, weights=[c[1] for c in SPECTRAL_CLASSES])[0]
+    temperature = rng.randint(t_min, t_max)
+    planets = []
+    orbit = 0.0
+    for i in range(rng.randint(0, 8)):
+        orbit += rng.uniform(0.2, 3.0)
+        planets.append({
+            'name': f"{name} {chr(ord('b') + i)}",
+            'kind': rng.choice(PLANET_KINDS),
+            'orbit_au': round(orbit, 2),
+        })
+    return {
+        'name': name,
+        'spectral_class': spectral,
+        'temperature_k': temperature,
+        'color': color,
+        'planets': planets,
+    }
+
+def get_star_details(sid: int) -> Dict:
+    """Return the details of a star: name, spectral class, temperature, colour and planets.
 
-    Uses a chunk cache and a small hysteresis radius to avoid flicker when
-    moving between chunks.
+    Derived lazily and deterministically from a per-star RNG substream, and
+    memoized, so only selected or queried stars pay for it.
     """
-    pcx = math.floor(cam_pos[0] / utils.config.CHUNK_SIZE)
-    pcy = math.floor(cam_pos[1] / utils.config.CHUNK_SIZE)
-    pcz = math.floor(cam_pos[2] / utils.config.CHUNK_SIZE)
-    
-    visible_stars = []
-    chunks_loaded = 0
+    return _star_details(get_active_seed(), sid)
+
+def get_render_origin() -> Tuple[int, int, int]:
+    """Return the chunk currently used as the floating render origin."""
+    return render_origin
+
+def camera_in_render_frame(cam_pos: List[float]) -> List[float]:
+    """Return the camera position relative to the current render origin."""
+    size = utils.config.CHUNK_SIZE
+    ox, oy, oz = render_origin
+    return [cam_pos[0] - ox * size, cam_pos[1] - oy * size, cam_pos[2] - oz * size]
+
+def _update_render_origin(pcx: int, pcy: int, pcz: int) -> None:
+    """Move the render origin to the camera chunk once the camera drifts too far from it."""
+    global render_origin
+    ox, oy, oz = render_origin
+    limit = utils.config.ORIGIN_REBASE_CHUNKS
+    if abs(pcx - ox) > limit or abs(pcy - oy) > limit or abs(pcz - oz) > limit:
+        logger.debug(f"Rebasing render origin {render_origin} -> {(pcx, pcy, pcz)}")
+        render_origin = (pcx, pcy, pcz)
+
+def get_star(sid: int) -> Optional[Tuple]:
+    """Return the world tuple (x, y, z, size, name) of a star ID, or None if it does not exist.
 
-    # Pre-load an extra border of chunks (hysteresis) to avoid flicker
+    Uses the cache when the chunk is loaded, otherwise regenerates only that chunk.
+    """
+    key, index = split_star_id(sid)
+    chunk = stars_cache.get(key)
+    if chunk is None:
+        chunk = generate_chunk(*key)
+    if index >= len(chunk):
+        return None
+    lx, ly, lz, size = chunk.local(index)
+    cs = utils.config.CHUNK_SIZE
+    return (key[0] * cs + lx, key[1] * cs + ly, key[2] * cs + lz, size, get_star_details(sid)['name'])
+
+def _valid_star_id(sid) -> bool:
+    """Return True if `sid` is a star ID of an existing star."""
+    if not isinstance(sid, int) or isinstance(sid, bool) or sid < 0:
+        return False
+    return get_star(sid) is not None
+
+# Max distance between an old-style saved star and the star it is matched to
+STAR_MATCH_TOLERANCE = 0.5
+
+def find_star_id(world_star) -> Optional[int]:
+    """Return the ID of the star at an old-style world tuple (x, y, z, size, name), or None.
+
+    Used for saves made before star IDs. The nearest star in the same chunk is
+    only accepted within STAR_MATCH_TOLERANCE: saves from versions whose chunk
+    generation also drew names have stars at other positions, and picking the
+    nearest one would select an unrelated star.
+    """
+    cs = utils.config.CHUNK_SIZE
+    key = tuple(math.floor(world_star[i] / cs) for i in range(3))
+    chunk = stars_cache.get(key)
+    if chunk is None:
+        chunk = generate_chunk(*key)
+    best, best_d = None, None
+    for index in range(len(chunk)):
+        lx, ly, lz, _ = chunk.local(index)
+        d = (key[0] * cs + lx - world_star[0]) ** 2 + (key[1] * cs + ly - world_star[1]) ** 2 + (key[2] * cs + lz - world_star[2]) ** 2
+        if best_d is None or d < best_d:
+            best, best_d = index, d
+    if best is None or best_d > STAR_MATCH_TOLERANCE ** 2:
+        logger.warning(f"No star at the saved position of {world_star[4] if len(world_star) > 4 else world_star}; "
+                       f"the universe layout changed since this save, dropping the selection")
+        return None
+    return star_id(key, best)
+
+def add_chunk_listener(on_loaded, on_evicted) -> None:
+    """Register callbacks `on_loaded(key, stars)` / `on_evicted(key, stars)` for chunk cache changes."""
+    chunk_listeners.append((on_loaded, on_evicted))
+
+def _notify_evict_all():
+    """Tell listeners that every cached chunk is about to be dropped."""
+    for key, stars in stars_cache.items():
+        for _, on_evicted in chunk_listeners:
+            on_evicted(key, stars)
+
+def _camera_chunk(cam_pos: List[float]) -> Tuple[int, int, int]:
+    size = utils.config.CHUNK_SIZE
+    return math.floor(cam_pos[0] / size), math.floor(cam_pos[1] / size), math.floor(cam_pos[2] / size)
+
+def generate_pending_chunks(cam_pos: List[float], cam_rot: List[float] = None) -> int:
+    """Generate missing chunks around the camera within this frame's budget. Call once per frame.
+
+    The load cube is only rescanned and the queue re-prioritised when the
+    camera changes chunk, the radius changes or the view turns (see
+    `ChunkScheduler.needs_plan`). Returns the number of chunks that finished;
+    when it is non-zero the visible stars should be collected again.
+    """
+    chunk_scheduler.begin_frame()
+    pcx, pcy, pcz = _camera_chunk(cam_pos)
+    # Pre-load an extra border of chunks (hysteresis) to avoid flicker.
+    # Missing chunks are queued and generated within the frame budget, nearest in-view first.
     load_radius = utils.config.CHUNK_RADIUS + 1
-    for cx in range(pcx - load_radius, pcx + load_radius + 1):
-        for cy in range(pcy - load_radius, pcy + load_radius + 1):
-            for cz in range(pcz - load_radius, pcz + load_radius + 1):
-                key = (cx, cy, cz)
-                if key not in stars_cache:
-                    stars_cache[key] = generate_chunk(cx, cy, cz)
-                    chunks_loaded += 1
-                    logger.debug(f"Generated chunk {key} with {len(stars_cache[key])} stars (cache_size={len(stars_cache)})")
+    if chunk_scheduler.needs_plan((pcx, pcy, pcz), load_radius, cam_rot):
+        missing = []
+        for cx in range(pcx - load_radius, pcx + load_radius + 1):
+            for cy in range(pcy - load_radius, pcy + load_radius + 1):
+                for cz in range(pcz - load_radius, pcz + load_radius + 1):
+                    key = (cx, cy, cz)
+                    if key not in stars_cache:
+                        missing.append(key)
+        chunk_scheduler.plan(missing, cam_pos, cam_rot, (pcx, pcy, pcz), load_radius)
+    if not chunk_scheduler.backlog:
+        return 0
+
+    chunks_loaded = 0
+    for key, chunk in chunk_scheduler.run(utils.config.CHUNK_GEN_BUDGET_MS, generate_chunk):
+        stars_cache[key] = chunk
+        chunks_loaded += 1
+        for on_loaded, _ in chunk_listeners:
+            on_loaded(key, chunk)
+        logger.debug(f"Generated chunk {key} with {len(chunk)} stars (cache_size={len(stars_cache)})")
+    if chunk_scheduler.backlog:
+        logger.debug(f"Chunk backlog: {chunk_scheduler.backlog} (used {chunk_scheduler.last_used_ms:.2f} ms)")
+    return chunks_loaded
+
+def update_visible_stars(cam_pos: List[float], cam_rot: List[float] = None) -> List[Tuple]:
+    """Generate pending chunks, then collect the visible stars.
+
+    Returns (visible_stars, chunks_loaded); see `generate_pending_chunks` and
+    `collect_visible_stars`. The game loop calls the two separately so that
+    stars are only collected again when chunks finished or on its interval.
+    """
+    chunks_loaded = generate_pending_chunks(cam_pos, cam_rot)
+    return collect_visible_stars(cam_pos), chunks_loaded
+
+def collect_visible_stars(cam_pos: List[float]) -> List[Tuple]:
+    """Return the visible stars around the camera from the loaded chunks.
+
+    Uses a small hysteresis radius to avoid flicker when moving between
+    chunks. Returned star tuples (x, y, z, size, star_id) are in the render
+    frame (relative to `render_origin`, see `camera_in_render_frame`). The time
+    spent counts against the chunk generation budget of the frame.
+    """
+    started = time.perf_counter()
+    pcx, pcy, pcz = _camera_chunk(cam_pos)
+    _update_render_origin(pcx, pcy, pcz)
+    visible_stars = []
 
     # Update the set of visible chunks with hysteresis:
     # - add all chunks inside the normal radius
@@ -110,45 +346,49 @@ def update_visible_stars(cam_pos: List[float], cam_rot: List[float] = None) -> L
         visible_chunk_keys.discard(key)
         logger.debug(f"Removed visible chunk key (out of hysteresis): {key}")
 
-    # Collect stars from all chunks we keep as visible
+    # Collect stars from all chunks we keep as visible, offset into the render frame
+    size = utils.config.CHUNK_SIZE
+    ox, oy, oz = render_origin
     for key in visible_chunk_keys:
-        if key in stars_cache:
-            visible_stars.extend(stars_cache[key])
+        chunk = stars_cache.get(key)
+        if chunk is None:
+            continue
+        bx = (key[0] - ox) * size
+        by = (key[1] - oy) * size
+        bz = (key[2] - oz) * size
+        c = chunk.coords
+        base_id = chunk_code(key) << STAR_INDEX_BITS
+        for i in range(len(chunk)):
+            j = i * 4
+            visible_stars.append((bx + c[j], by + c[j + 1], bz + c[j + 2], c[j + 3], base_id | i))
 
-    logger.debug(f"Visible chunks: {len(visible_chunk_keys)}, visible_stars_count={len(visible_stars)}, chunks_loaded_this_call={chunks_loaded}")
+    logger.debug(f"Visible chunks: {len(visible_chunk_keys)}, visible_stars_count={len(visible_stars)}")
     
     # Prioritize stars closest to the camera and limit to MAX_VISIBLE_STARS
     if len(visible_stars) > utils.config.MAX_VISIBLE_STARS:
-        camx, camy, camz = cam_pos[0], cam_pos[1], cam_pos[2]
+        camx, camy, camz = camera_in_render_frame(cam_pos)
         star_dist_pairs = [((s[0]-camx)**2 + (s[1]-camy)**2 + (s[2]-camz)**2, s) for s in visible_stars]
         star_dist_pairs.sort(key=lambda x: x[0])
         trimmed = len(visible_stars) - utils.config.MAX_VISIBLE_STARS
         visible_stars = [s for _, s in star_dist_pairs[:utils.config.MAX_VISIBLE_STARS]]
         logger.debug(f"Trimmed {trimmed} stars to MAX_VISIBLE_STARS={utils.config.MAX_VISIBLE_STARS} (kept closest)")
-    
-    return visible_stars, chunks_loaded
 
-def handle_mouse_movement(cam_rot):
-    """Handle camera rotation using the mouse input."""
-    mx, my = pygame.mouse.get_pos()
-    center_x, center_y = utils.config.WIDTH // 2, utils.config.HEIGHT // 2
-    dx, dy = mx - center_x, my - center_y
-
-    if dx or dy:
-        cam_rot[1] += dx * utils.config.MOUSE_SENS
-        cam_rot[0] -= dy * utils.config.MOUSE_SENS
-        cam_rot[0] = max(-math.pi/2 + 0.01, min(math.pi/2 - 0.01, cam_rot[0]))
-        pygame.mouse.set_pos(center_x, center_y)
+    chunk_scheduler.account_collection((time.perf_counter() - started) * 1000.0)
+    return visible_stars
 
 def clear_stars_cache():
     """Clear the star cache so the universe will be regenerated."""
     global stars_cache
+    _notify_evict_all()
     stars_cache.clear()
+    chunk_scheduler.reset()
 
 def set_universe_seed(new_seed: str):
     """Set a new universe seed and clear the cache."""
     global stars_cache
+    _notify_evict_all()
     stars_cache.clear()
+    chunk_scheduler.reset()
     # Update the configuration
     utils.config.USE_CUSTOM_SEED = True
     utils.config.CUSTOM_SEED = new_seed
@@ -163,12 +403,12 @@ def get_universe_info():
         'cache_size': len(stars_cache)
     }
 
-def save_game(name: str, cam_pos, cam_rot, selected_star=None) -> str:
+def save_game(name: str, cam_pos, cam_rot, selected_star_id=None) -> str:
     """Save the current game state under `name`. Returns the saved file path."""
     state = {
         'cam_pos': list(cam_pos),
         'cam_rot': list(cam_rot),
-        'selected_star': selected_star,
+        'selected_star_id': selected_star_id,
         'seed': get_active_seed(),
         'timestamp': time.time()
     }
@@ -177,7 +417,11 @@ def save_game(name: str, cam_pos, cam_rot, selected_star=None) -> str:
     return path
 
 def load_game(name_or_filename: str):
-    """Load a save and return the state dictionary, or None if not found."""
+    """Load a save and return the state dictionary, or None if not found.
+
+    Older saves storing the full `selected_star` tuple get a `selected_star_id` resolved from it.
+    A `selected_star_id` that is not a valid star ID (e.g. a hand-edited save) is dropped.
+    """
     state = save_manager.load_state(name_or_filename)
     if not state:
         logger.warning(f"Save not found: {name_or_filename}")
@@ -185,6 +429,12 @@ def load_game(name_or_filename: str):
     # Apply seed if present
     if 'seed' in state and state.get('seed'):
         set_universe_seed(state.get('seed'))
+    sid = state.get('selected_star_id')
+    if sid is not None and not _valid_star_id(sid):
+        logger.warning(f"Ignoring invalid selected_star_id in save {name_or_filename}: {sid!r}")
+        state['selected_star_id'] = None
+    if state.get('selected_star_id') is None and state.get('selected_star'):
+        state['selected_star_id'] = find_star_id(state['selected_star'])
     logger.info(f"Loaded game '{name_or_filename}'")
     return state
 
@@ -192,10 +442,21 @@ def list_saves():
     """Return metadata for available saves."""
     return save_manager.list_saves()
 
+def get_chunk_scheduler_stats():
+    """Return backlog and budget utilisation of chunk generation."""
+    return chunk_scheduler.stats()
+
 def get_performance_stats():
     """Return simple performance statistics about cache and stars."""
     return {
         'cache_size': len(stars_cache),
         'total_stars': sum(len(stars) for stars in stars_cache.values()),
-        'memory_usage_mb': len(stars_cache) * 0.1  # Approximate estimate
+        'memory_usage_mb': sum(chunk.nbytes() for chunk in stars_cache.values()) / (1024 * 1024)
     }
+
+def __getattr__(name):
+    # Backwards compatibility: the pygame helpers moved to rendering.window
+    if name in ('initialize_pygame', 'handle_mouse_movement'):
+        import rendering.window
+        return getattr(rendering.window, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
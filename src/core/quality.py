@@ -0,0 +1,119 @@
+"""Adaptive quality controller.
+
+Watches how long each frame's work takes and walks a ladder of quality
+levels (`utils.config.QUALITY_LEVELS`) to hold `utils.config.TARGET_FPS`. Each
+level sets the star budget, view radius, LOD distance and chunk update cadence.
+
+The controller is fed the frame *work* time (update + render, without the
+pacing wait), not the frame interval: with a frame cap the interval never
+drops below 1 / TARGET_FPS, so it cannot show spare capacity. The load is
+the work time as a fraction of the frame budget (1 / TARGET_FPS).
+
+Oscillation is avoided with:
+- a dead band: drop a level above 1 + `QUALITY_FPS_TOLERANCE` load, climb only
+  below `QUALITY_UPGRADE_HEADROOM` load (the next level must fit in the spare time)
+- hold times: the load must stay outside the band for a while before acting
+- a cooldown after each change so the new level can be measured
+- an upgrade backoff: a level that failed to hold the target is locked for a while
+"""
+import utils.config
+import logging
+from typing import Dict, List, Optional
+
+# Core only looks up the logger; handlers are set up by the entry points (utils.logger.configure_logging)
+logger = logging.getLogger('universe')
+
+
+class QualityController:
+    """Feedback controller that adjusts the runtime quality settings."""
+
+    def __init__(self, levels: List[Dict] = None, start_level: int = None):
+        self.levels = levels if levels is not None else utils.config.QUALITY_LEVELS
+        if start_level is None:
+            start_level = utils.config.QUALITY_START_LEVEL
+        self.level = max(0, min(len(self.levels) - 1, start_level))
+        self.load = 0.0  # Average work time / frame budget
+        self.capacity_fps = 0.0  # Frame rate the work alone would allow
+        self.last_decision = "start"
+        self._below_since: Optional[float] = None
+        self._above_since: Optional[float] = None
+        self._last_change = 0.0
+        self._last_upgrade = None
+        # level index -> time until which upgrading into it is blocked
+        self._locked_until: Dict[int, float] = {}
+        self._apply()
+
+    @property
+    def settings(self) -> Dict:
+        return self.levels[self.level]
+
+    def _apply(self):
+        """Push the current level into the runtime configuration."""
+        s = self.settings
+        utils.config.MAX_VISIBLE_STARS = s['max_visible_stars']
+        utils.config.CHUNK_RADIUS = s['chunk_radius']
+        utils.config.LOD_DISTANCE = s['lod_distance']
+        utils.config.CHUNK_UPDATE_INTERVAL = s['chunk_update_interval']
+
+    def _change(self, new_level: int, now: float, reason: str):
+        old_level = self.level
+        self.level = new_level
+        self._last_change = now
+        self._below_since = None
+        self._above_since = None
+        self._apply()
+        s = self.settings
+        self.last_decision = f"{reason} {old_level}->{new_level}"
+        logger.info(
+            f"Quality {reason}: level {old_level} -> {new_level} (load={self.load * 100:.0f}%, capacity_fps={self.capacity_fps:.1f}, target={utils.config.TARGET_FPS}) "
+            f"stars={s['max_visible_stars']} radius={s['chunk_radius']} lod={s['lod_distance']:.0f} interval={s['chunk_update_interval']:.2f}s"
+        )
+
+    def update(self, work_times: List[float], now: float) -> bool:
+        """Feed the recent frame work times (seconds, without the pacing wait).
+
+        Returns True if the level changed.
+        """
+        if not work_times:
+            return False
+        avg_work = sum(work_times) / len(work_times)
+        if avg_work <= 0:
+            return False
+        self.load = avg_work * utils.config.TARGET_FPS
+        self.capacity_fps = 1.0 / avg_work
+
+        if now - self._last_change < utils.config.QUALITY_COOLDOWN:
+            return False
+
+        if self.load > 1.0 + utils.config.QUALITY_FPS_TOLERANCE:
+            self._above_since = None
+            if self._below_since is None:
+                self._below_since = now
+            if now - self._below_since >= utils.config.QUALITY_DOWNGRADE_HOLD and self.level > 0:
+                # A level we just climbed into could not hold the target: lock it for a while
+                if self._last_upgrade is not None and now - self._last_upgrade < utils.config.QUALITY_UPGRADE_HOLD + utils.config.QUALITY_COOLDOWN:
+                    self._locked_until[self.level] = now + utils.config.QUALITY_UPGRADE_BACKOFF
+                self._last_upgrade = None
+                self._change(self.level - 1, now, "downgrade")
+                return True
+        elif self.load < utils.config.QUALITY_UPGRADE_HEADROOM:
+            self._below_since = None
+            if self._above_since is None:
+                self._above_since = now
+            next_level = self.level + 1
+            if (now - self._above_since >= utils.config.QUALITY_UPGRADE_HOLD
+                    and next_level < len(self.levels)
+                    and self._locked_until.get(next_level, 0.0) <= now):
+                self._last_upgrade = now
+                self._change(next_level, now, "upgrade")
+                return True
+        else:
+            # Inside the dead band: hold the current level
+            self._below_since = None
+            self._above_since = None
+        return False
+
+    def hud_text(self) -> str:
+        """Return a short HUD line describing the current quality state."""
+        s = self.settings
+        return f"Qualidade: N{self.level} ({self.last_decision}) carga={self.load * 100:.0f}% r={s['chunk_radius']} max={s['max_visible_stars']}"
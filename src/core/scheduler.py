@@ -0,0 +1,145 @@
+"""Frame-time-budgeted chunk generation.
+
+Missing chunks are not generated all at once: `core.engine` hands them to a
+`ChunkScheduler`, which orders them (chunks in the view cone first, then by
+distance) and generates as many as fit in the per-frame budget
+(`utils.config.CHUNK_GEN_BUDGET_MS`). The rest stay queued for the next frames.
+
+The queue is only rebuilt when the camera changes chunk, the load radius
+changes or the view turns by more than `REPLAN_ANGLE_DEG`. Planning and
+collecting the visible stars afterwards count against the same budget.
+"""
+import heapq
+import math
+import time
+import utils.config
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Re-prioritise the queue when the view turns by more than this
+REPLAN_ANGLE_DEG = 15.0
+
+
+def view_direction(cam_rot: List[float]) -> Tuple[float, float, float]:
+    """Return the unit forward vector for (pitch, yaw), matching `world_to_screen`."""
+    sin_x, cos_x = math.sin(cam_rot[0]), math.cos(cam_rot[0])
+    sin_y, cos_y = math.sin(cam_rot[1]), math.cos(cam_rot[1])
+    return (sin_y * cos_x, sin_x, cos_y * cos_x)
+
+
+def _half_fov_diagonal() -> float:
+    # Half angle from the view axis to a screen corner
+    half = math.radians(utils.config.FOV_DEG / 2)
+    aspect = utils.config.HEIGHT / utils.config.WIDTH
+    return math.atan(math.tan(half) * math.sqrt(1 + aspect * aspect))
+
+
+class ChunkScheduler:
+    """Priority queue of chunks waiting to be generated, drained under a time budget."""
+
+    def __init__(self):
+        self._heap = []
+        # (camera chunk, load radius, view direction) the queue was planned for
+        self._planned_for = None
+        self._frame_start = time.perf_counter()
+        self.last_budget_ms: Optional[float] = None
+        self.last_used_ms = 0.0
+        self.last_collect_ms = 0.0
+        self.last_generated = 0
+        self.generated_total = 0
+
+    @property
+    def backlog(self) -> int:
+        return len(self._heap)
+
+    def begin_frame(self) -> None:
+        """Start the frame's time accounting (planning, generation and collection)."""
+        self._frame_start = time.perf_counter()
+        self.last_used_ms = 0.0
+        self.last_generated = 0
+
+    def reset(self) -> None:
+        """Drop the queue and the plan (e.g. when the chunk cache is cleared)."""
+        self._heap = []
+        self._planned_for = None
+
+    def needs_plan(self, center: Tuple[int, int, int], radius: int, cam_rot: Optional[List[float]]) -> bool:
+        """Return True if the queue was planned for another chunk, radius or view direction."""
+        if self._planned_for is None:
+            return True
+        planned_center, planned_radius, planned_forward = self._planned_for
+        if planned_center != center or planned_radius != radius:
+            return True
+        if cam_rot is None or planned_forward is None:
+            return (cam_rot is None) != (planned_forward is None)
+        forward = view_direction(cam_rot)
+        dot = forward[0] * planned_forward[0] + forward[1] * planned_forward[1] + forward[2] * planned_forward[2]
+        return dot < math.cos(math.radians(REPLAN_ANGLE_DEG))
+
+    def plan(self, missing: Iterable[Tuple[int, int, int]], cam_pos: List[float], cam_rot: Optional[List[float]],
+             center: Tuple[int, int, int] = None, radius: int = None) -> None:
+        """Replace the queue with `missing`, prioritised for the current camera.
+
+        `center` and `radius` (camera chunk and load radius) are remembered for `needs_plan`.
+        """
+        size = utils.config.CHUNK_SIZE
+        # Camera position in chunk units
+        px, py, pz = cam_pos[0] / size, cam_pos[1] / size, cam_pos[2] / size
+        forward = view_direction(cam_rot) if cam_rot is not None else None
+        self._planned_for = (center, radius, forward) if center is not None else None
+        half_fov = _half_fov_diagonal()
+        heap = []
+        for key in missing:
+            dx, dy, dz = key[0] + 0.5 - px, key[1] + 0.5 - py, key[2] + 0.5 - pz
+            dist = math.sqrt(dx * dx + dy * dy + dz * dz)
+            in_view = True
+            if forward is not None and dist > 1.5:
+                cos_angle = (dx * forward[0] + dy * forward[1] + dz * forward[2]) / dist
+                # Widen the cone by the chunk's angular radius (half its diagonal)
+                margin = math.asin(min(1.0, 0.87 / dist))
+                in_view = math.acos(max(-1.0, min(1.0, cos_angle))) <= half_fov + margin
+            heap.append((0 if in_view else 1, dist, key))
+        heapq.heapify(heap)
+        self._heap = heap
+
+    def run(self, budget_ms: Optional[float], generate: Callable) -> List[Tuple[Tuple[int, int, int], object]]:
+        """Generate queued chunks until `budget_ms` is spent (None = no limit).
+
+        The budget counts from `begin_frame` and keeps back the last collection
+        time, since the visible stars are collected again once chunks finish.
+        At least one chunk is generated per call so the backlog always drains.
+        Returns a list of (key, chunk).
+        """
+        done = []
+        deadline = None
+        if budget_ms is not None:
+            deadline = self._frame_start + max(0.0, budget_ms - self.last_collect_ms) / 1000.0
+        while self._heap:
+            if done and deadline is not None and time.perf_counter() >= deadline:
+                break
+            _, _, key = heapq.heappop(self._heap)
+            done.append((key, generate(*key)))
+        self.last_budget_ms = budget_ms
+        self.last_used_ms = (time.perf_counter() - self._frame_start) * 1000.0
+        self.last_generated = len(done)
+        self.generated_total += len(done)
+        return done
+
+    def account_collection(self, ms: float) -> None:
+        """Add the time spent collecting visible stars to this frame's usage."""
+        self.last_collect_ms = ms
+        self.last_used_ms += ms
+
+    def stats(self) -> Dict:
+        """Return backlog and budget utilisation of the last run."""
+        utilisation = None
+        if self.last_budget_ms:
+            utilisation = self.last_used_ms / self.last_budget_ms
+        return {
+            'backlog': self.backlog,
+            'budget_ms': self.last_budget_ms,
+            'used_ms': self.last_used_ms,
+            'collect_ms': self.last_collect_ms,
+            'utilisation': utilisation,
+            'generated_last': self.last_generated,
+            'generated_total': self.generated_total,
+        }
@@ -1,28 +1,40 @@
-from core.engine import initialize_pygame, update_visible_stars, handle_mouse_movement, get_universe_info, get_performance_stats, save_game, load_game, list_saves
+from core.engine import (
+    update_visible_stars, generate_pending_chunks, collect_visible_stars, get_universe_info, get_performance_stats,
+    save_game, load_game, list_saves, add_chunk_listener,
+    camera_in_render_frame, get_star, get_star_details, get_chunk_scheduler_stats
+)
+from core.quality import QualityController
 from rendering.render import (
     draw_cursor, draw_arrow, draw_star_info, draw_text, world_to_screen,
-    draw_gradient_background, create_panel_surface
+    draw_gradient_background, create_panel_surface, draw_minimap, draw_stars
 )
+from rendering.minimap import MinimapDensityLayer
+from rendering.window import initialize_pygame, handle_mouse_movement
+from rendering.pacing import FramePacer
+from rendering.occupancy import OccupancyMap
 import utils.config
 import os
 import pygame
 import sys
 import math
 import time
+import logging
 import utils.logger
 
 logger = utils.logger.get_logger()
 
-def main(load=None, save_on_start=None, headless=False, fps=None, profile=False):
+def main(load=None, save_on_start=None, headless=False, fps=None, profile=False, adaptive=None, pacing=None):
     cam_pos = [0.0, 0.0, -10.0]
     cam_rot = [0.0, 0.0]  # pitch, yaw
-    selected_star = None
+    selected_star_id = None
+    selected_star = None  # World tuple (x, y, z, size, name) of the selected star, resolved once
     # In-game save input
     save_input_active = False
     save_input_text = ""
     # Input UI font
     input_font = None
     frame_times = []  # For calculating average FPS
+    work_times = []  # Per-frame update + render time, without the pacing wait (adaptive quality input)
     last_time = time.time()
 
     # Apply runtime flags
@@ -30,8 +42,20 @@ def main(load=None, save_on_start=None, headless=False, fps=None, profile=False)
         utils.config.TARGET_FPS = int(fps)
     if profile:
         utils.config.DEBUG_LOG = True
+    if adaptive is not None:
+        utils.config.ADAPTIVE_QUALITY = bool(adaptive)
+    if pacing is not None:
+        utils.config.FRAME_PACING = pacing
+    # After the flags, so --profile takes effect
+    utils.logger.configure_logging()
+
+    # Adaptive quality controller (drives star budget, radius, LOD and update cadence)
+    quality = QualityController() if utils.config.ADAPTIVE_QUALITY else None
 
     screen, clock = initialize_pygame()
+    pacer = FramePacer(clock)
+    # Optional screen-space occupancy culling of stars hidden behind nearer ones
+    occupancy = OccupancyMap() if utils.config.PIXEL_OCCUPANCY_CULLING else None
 
     # initialize input font after pygame.init
     input_font = pygame.font.SysFont("monospace", 16, bold=True)
@@ -42,7 +66,14 @@ def main(load=None, save_on_start=None, headless=False, fps=None, profile=False)
         if state:
             cam_pos = state.get('cam_pos', cam_pos)
             cam_rot = state.get('cam_rot', cam_rot)
-            selected_star = state.get('selected_star', selected_star)
+            selected_star_id = state.get('selected_star_id', selected_star_id)
+            selected_star = get_star(selected_star_id) if selected_star_id is not None else None
+
+    # Minimap density layer, kept in sync with the chunk cache
+    minimap_layer = None
+    if utils.config.SHOW_MINIMAP:
+        minimap_layer = MinimapDensityLayer()
+        add_chunk_listener(minimap_layer.on_chunk_loaded, minimap_layer.on_chunk_evicted)
 
     # Initialize visible stars
     visible_stars, chunks_loaded = update_visible_stars(cam_pos, cam_rot)
@@ -50,7 +81,7 @@ def main(load=None, save_on_start=None, headless=False, fps=None, profile=False)
     # If requested via CLI, save immediately with the provided name
     if save_on_start:
         try:
-            path = save_game(save_on_start, cam_pos, cam_rot, selected_star)
+            path = save_game(save_on_start, cam_pos, cam_rot, selected_star_id)
             logger.info(f"Saved on start -> {path}")
         except Exception:
             logger.exception("Failed to save on start")
@@ -60,7 +91,8 @@ def main(load=None, save_on_start=None, headless=False, fps=None, profile=False)
 
     while True:
         current_time = time.time()
-        dt = clock.tick(utils.config.TARGET_FPS) / 1000.0
+        dt = pacer.tick()
+        frame_start = time.perf_counter()
         
         # Calculate average FPS (simplified)
         frame_times.append(current_time - last_time)
@@ -69,11 +101,15 @@ def main(load=None, save_on_start=None, headless=False, fps=None, profile=False)
         avg_fps = 1.0 / (sum(frame_times) / len(frame_times)) if frame_times else 0
         last_time = current_time
 
+        if quality:
+            quality.update(work_times, current_time)
+
             # Draw a simple background
         draw_gradient_background(screen)
 
         # Eventos
         for event in pygame.event.get():
+            pacer.note_event(event)
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
@@ -87,7 +123,7 @@ def main(load=None, save_on_start=None, headless=False, fps=None, profile=False)
                                     # confirm save
                         if save_input_text.strip():
                             try:
-                                path = save_game(save_input_text.strip(), cam_pos, cam_rot, selected_star)
+                                path = save_game(save_input_text.strip(), cam_pos, cam_rot, selected_star_id)
                                 logger.info(f"Saved -> {path}")
                             except Exception:
                                 logger.exception("Failed to save via input")
@@ -109,7 +145,7 @@ def main(load=None, save_on_start=None, headless=False, fps=None, profile=False)
                 # Quick save with timestamp
                 try:
                     save_name = f"quick_{int(time.time())}"
-                    path = save_game(save_name, cam_pos, cam_rot, selected_star)
+                    path = save_game(save_name, cam_pos, cam_rot, selected_star_id)
                     logger.info(f"Quick saved -> {path}")
                 except Exception as e:
                     logger.exception(f"Failed to quick save: {e}")
@@ -127,7 +163,8 @@ def main(load=None, save_on_start=None, headless=False, fps=None, profile=False)
                         if state:
                             cam_pos = state.get('cam_pos', cam_pos)
                             cam_rot = state.get('cam_rot', cam_rot)
-                            selected_star = state.get('selected_star', selected_star)
+                            selected_star_id = state.get('selected_star_id', selected_star_id)
+                            selected_star = get_star(selected_star_id) if selected_star_id is not None else None
                             logger.info(f"Quick loaded {latest}")
                     else:
                         logger.info("No save found to load.")
@@ -142,13 +179,15 @@ def main(load=None, save_on_start=None, headless=False, fps=None, profile=False)
                     logger.exception(f"Failed to list saves: {e}")
             elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:  # Left click
                 mx, my = pygame.mouse.get_pos()
+                cam_local = camera_in_render_frame(cam_pos)
                 # Search all visible stars for selection
                 for star in visible_stars:
-                    screen_pos = world_to_screen(*star[:3], cam_pos, cam_rot)
+                    screen_pos = world_to_screen(*star[:3], cam_local, cam_rot)
                     if screen_pos and math.hypot(mx - screen_pos[0], my - screen_pos[1]) < 10:
-                        selected_star = star
+                        selected_star_id = star[4]
+                        selected_star = get_star(selected_star_id)
                         # Selection log
-                        sx, sy, sz, ssize, sname = star
+                        sx, sy, sz, ssize, sname = selected_star
                         cx = math.floor(sx / utils.config.CHUNK_SIZE)
                         cy = math.floor(sy / utils.config.CHUNK_SIZE)
                         cz = math.floor(sz / utils.config.CHUNK_SIZE)
@@ -160,6 +199,8 @@ def main(load=None, save_on_start=None, headless=False, fps=None, profile=False)
         forward = keys[pygame.K_w] - keys[pygame.K_s]
         strafe = keys[pygame.K_d] - keys[pygame.K_a]
         vertical = keys[pygame.K_e] - keys[pygame.K_q]
+        if forward or strafe or vertical:
+            pacer.mark_active()
 
         sin_y, cos_y = math.sin(cam_rot[1]), math.cos(cam_rot[1])
         cam_pos[0] += (strafe * cos_y + forward * sin_y) * utils.config.MOVE_SPEED * dt
@@ -171,6 +212,7 @@ def main(load=None, save_on_start=None, headless=False, fps=None, profile=False)
 
         # Auto-move for debug (always forward in the current direction)
         if AUTO_MOVE:
+            pacer.mark_active()
             auto_forward = 1.0
             sin_y, cos_y = math.sin(cam_rot[1]), math.cos(cam_rot[1])
             cam_pos[0] += (auto_forward * sin_y) * utils.config.MOVE_SPEED * dt
@@ -184,63 +226,85 @@ def main(load=None, save_on_start=None, headless=False, fps=None, profile=False)
                 logger.info(f"Crossed chunk boundary: {prev_chunk} -> {cur_chunk}, cam_pos=({cam_pos[0]:.1f},{cam_pos[1]:.1f},{cam_pos[2]:.1f})")
                 prev_chunk = cur_chunk
 
-        # Update visible stars periodically (time-based instead of per-frame)
-        if current_time - last_chunk_update > 0.12:  # ~8-9 updates per second
-            visible_stars, chunks_loaded = update_visible_stars(cam_pos, cam_rot)
+        # Generate missing chunks within the frame budget; collect visible stars
+        # periodically (time-based instead of per-frame) or when chunks finished
+        chunks_loaded = generate_pending_chunks(cam_pos, cam_rot)
+        if chunks_loaded or current_time - last_chunk_update > utils.config.CHUNK_UPDATE_INTERVAL:
+            visible_stars = collect_visible_stars(cam_pos)
+            visible_ids = {s[4] for s in visible_stars}
             last_chunk_update = current_time
-            # Check if the selected star is still visible
-            if selected_star and selected_star not in visible_stars:
-                logger.info(f"Selected star no longer visible, clearing selection: {selected_star[4]}")
+            chunk_stats = get_chunk_scheduler_stats()
+            # Check if the selected star is still visible (once its chunk had a chance to load)
+            if selected_star_id is not None and not chunk_stats['backlog'] and selected_star_id not in visible_ids:
+                logger.info(f"Selected star no longer visible, clearing selection: {selected_star[4] if selected_star else selected_star_id}")
+                selected_star_id = None
                 selected_star = None
 
             # Log statistics after chunk update
             stats = get_performance_stats()
-            logger.debug(f"Chunk update: chunks_loaded={chunks_loaded}, cache_size={stats.get('cache_size')}, total_stars={stats.get('total_stars')}")
-            # Additional culling/projection stats for debugging
-            def _camera_space_z(px, py, pz, cam_pos, cam_rot):
-                x = px - cam_pos[0]
-                y = py - cam_pos[1]
-                z = pz - cam_pos[2]
-                sin_y, cos_y = math.sin(cam_rot[1]), math.cos(cam_rot[1])
-                x, z = x * cos_y - z * sin_y, x * sin_y + z * cos_y
-                sin_x, cos_x = math.sin(cam_rot[0]), math.cos(cam_rot[0])
-                y, z = y * cos_x - z * sin_x, y * sin_x + z * cos_x
-                return z
+            log_stats = utils.logger.get_log_stats()
+            logger.debug(f"Chunk update: chunks_loaded={chunks_loaded}, cache_size={stats.get('cache_size')}, total_stars={stats.get('total_stars')}, "
+                         f"backlog={chunk_stats['backlog']}, used_ms={chunk_stats['used_ms']:.2f}, collect_ms={chunk_stats['collect_ms']:.2f}, "
+                         f"log_queued={log_stats['queued']}, log_dropped={log_stats['dropped']}, log_suppressed={log_stats['suppressed']}")
+            if logger.isEnabledFor(logging.DEBUG):
+                # Additional culling/projection stats for debugging
+                def _camera_space_z(px, py, pz, cam_pos, cam_rot):
+                    x = px - cam_pos[0]
+                    y = py - cam_pos[1]
+                    z = pz - cam_pos[2]
+                    sin_y, cos_y = math.sin(cam_rot[1]), math.cos(cam_rot[1])
+                    x, z = x * cos_y - z * sin_y, x * sin_y + z * cos_y
+                    sin_x, cos_x = math.sin(cam_rot[0]), math.cos(cam_rot[0])
+                    y, z = y * cos_x - z * sin_x, y * sin_x + z * cos_x
+                    return z
+
+                cam_local = camera_in_render_frame(cam_pos)
+                total_tested = len(visible_stars)
+                in_front = sum(1 for s in visible_stars if _camera_space_z(s[0], s[1], s[2], cam_local, cam_rot) > 0)
+                on_screen = sum(1 for s in visible_stars if world_to_screen(s[0], s[1], s[2], cam_local, cam_rot) is not None)
+                logger.debug(f"Projection stats: tested={total_tested}, in_front={in_front}, on_screen={on_screen}")
 
-            total_tested = len(visible_stars)
-            in_front = sum(1 for s in visible_stars if _camera_space_z(s[0], s[1], s[2], cam_pos, cam_rot) > 0)
-            on_screen = sum(1 for s in visible_stars if world_to_screen(s[0], s[1], s[2], cam_pos, cam_rot) is not None)
-            logger.debug(f"Projection stats: tested={total_tested}, in_front={in_front}, on_screen={on_screen}")
+        chunk_stats = get_chunk_scheduler_stats()
 
-        # Render stars (optimized)
-        rendered_count = 0
-        for sx, sy, sz, size, name in visible_stars:
-            screen_pos = world_to_screen(sx, sy, sz, cam_pos, cam_rot)
-            if screen_pos:
-                # Ultra-simple rendering
-                pygame.draw.circle(screen, (255, 255, 255), screen_pos, max(1, int(size)))
-                rendered_count += 1
-                
-                # Highlight selected star
-                if selected_star and (sx, sy, sz, size, name) == selected_star:
-                    draw_arrow(screen, screen_pos)
+        # Render stars (optimized); projection happens in the floating-origin render frame
+        rendered_count, culled_count, selected_pos = draw_stars(
+            screen, visible_stars, camera_in_render_frame(cam_pos), cam_rot, selected_star_id, occupancy
+        )
+        # Highlight selected star
+        if selected_pos:
+            draw_arrow(screen, selected_pos)
 
         # Draw visible cursor
         draw_cursor(screen)
 
         # HUD with important information
         draw_text(screen, f"FPS: {avg_fps:.1f}", (10, 10), utils.config.UI_COLORS['success'])
-        draw_text(screen, f"Estrelas: {rendered_count}", (10, 30), utils.config.UI_COLORS['text'])
+        stars_text = f"Estrelas: {rendered_count}"
+        if occupancy:
+            stars_text += f" (ocultas: {culled_count})"
+        draw_text(screen, stars_text, (10, 30), utils.config.UI_COLORS['text'])
         draw_text(screen, f"Pos: ({cam_pos[0]:.0f}, {cam_pos[1]:.0f}, {cam_pos[2]:.0f})", (10, 50), utils.config.UI_COLORS['text'])
         
         # Seed information
         universe_info = get_universe_info()
         seed_text = f"Seed: {universe_info['seed'][:20]}{'...' if len(universe_info['seed']) > 20 else ''}"
         draw_text(screen, seed_text, (10, 70), utils.config.UI_COLORS['text'])
+        hud_y = 90
+        if quality:
+            draw_text(screen, quality.hud_text(), (10, hud_y), utils.config.UI_COLORS['text'])
+            hud_y += 20
+        if chunk_stats['backlog'] or chunk_stats['generated_last']:
+            budget = f"{chunk_stats['utilisation'] * 100:.0f}%" if chunk_stats['utilisation'] is not None else "sem limite"
+            draw_text(screen, f"Chunks: fila={chunk_stats['backlog']} orçamento={budget}", (10, hud_y), utils.config.UI_COLORS['text'])
+            hud_y += 20
+        draw_text(screen, pacer.hud_text(), (10, hud_y), utils.config.UI_COLORS['text'])
         
+        if minimap_layer:
+            draw_minimap(screen, cam_pos, minimap_layer, selected_star)
+
         # Display selected star information (if any)
         if selected_star:
-            draw_star_info(screen, selected_star)
+            draw_star_info(screen, selected_star, get_star_details(selected_star_id))
 
         # If save input mode is active, draw a simple panel
         if save_input_active:
@@ -254,7 +318,12 @@ def main(load=None, save_on_start=None, headless=False, fps=None, profile=False)
             panel.blit(txt, (12, 38))
             screen.blit(panel, ((utils.config.WIDTH - panel_w) // 2, (utils.config.HEIGHT - panel_h) // 2))
 
+        # Frame work ends before flip: with vsync the flip itself waits for the display
+        work_times.append(time.perf_counter() - frame_start)
+        if len(work_times) > 30:
+            work_times.pop(0)
         pygame.display.flip()
+        pacer.frame_presented()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,99 @@
+"""Cached top-down density layer used by the minimap.
+
+Stars are binned on the XZ plane into one small tile per chunk column
+(cx, cz). Tiles are updated incrementally when chunks are loaded into or
+evicted from the engine cache (see `core.engine.add_chunk_listener`), and
+only re-rendered when their counts change. Drawing the minimap is then a
+handful of tile blits with an offset, whatever the number of stars.
+"""
+import math
+import pygame
+import utils.config
+from array import array
+from typing import Dict, List, Tuple
+
+
+class MinimapDensityLayer:
+    """Per-chunk-column star density tiles, seen from above."""
+
+    def __init__(self, units_per_pixel: float = None):
+        if units_per_pixel is None:
+            units_per_pixel = utils.config.MINIMAP_UNITS_PER_PIXEL
+        self.units_per_pixel = units_per_pixel
+        self.tile_px = max(1, int(utils.config.CHUNK_SIZE / units_per_pixel))
+        # (cx, cz) -> star count per pixel, row-major tile_px * tile_px
+        self._counts: Dict[Tuple[int, int], array] = {}
+        # (cx, cz) -> rendered tile surface
+        self._tiles: Dict[Tuple[int, int], pygame.Surface] = {}
+        self._dirty = set()
+
+    def _bin(self, key: Tuple[int, int, int], chunk, delta: int) -> None:
+        cx, _, cz = key
+        column = (cx, cz)
+        counts = self._counts.get(column)
+        if counts is None:
+            if delta < 0:
+                return
+            counts = array('H', [0]) * (self.tile_px * self.tile_px)
+            self._counts[column] = counts
+        last = self.tile_px - 1
+        c = chunk.coords
+        # Chunk-local offsets map straight onto tile pixels
+        for j in range(0, len(c), 4):
+            px = min(last, max(0, int(c[j] / self.units_per_pixel)))
+            pz = min(last, max(0, int(c[j + 2] / self.units_per_pixel)))
+            idx = pz * self.tile_px + px
+            counts[idx] = max(0, min(0xFFFF, counts[idx] + delta))
+        if not any(counts):
+            del self._counts[column]
+            self._tiles.pop(column, None)
+            self._dirty.discard(column)
+        else:
+            self._dirty.add(column)
+
+    def on_chunk_loaded(self, key: Tuple[int, int, int], chunk) -> None:
+        """Add a chunk's stars (a `core.engine.StarChunk`) to the layer."""
+        self._bin(key, chunk, 1)
+
+    def on_chunk_evicted(self, key: Tuple[int, int, int], chunk) -> None:
+        """Remove a chunk's stars from the layer."""
+        self._bin(key, chunk, -1)
+
+    def _render_tile(self, column: Tuple[int, int]) -> pygame.Surface:
+        counts = self._counts[column]
+        tile = pygame.Surface((self.tile_px, self.tile_px), pygame.SRCALPHA)
+        r, g, b = utils.config.UI_COLORS['text']
+        for idx, count in enumerate(counts):
+            if count:
+                alpha = min(255, 90 + 55 * count)
+                tile.set_at((idx % self.tile_px, idx // self.tile_px), (r, g, b, alpha))
+        return tile
+
+    def blit(self, target: pygame.Surface, area: pygame.Rect, center: Tuple[int, int], cam_pos: List[float]) -> None:
+        """Blit the tiles around `cam_pos` onto `target`, clipped to `area`.
+
+        `center` is the target pixel that corresponds to the camera position.
+        """
+        # Re-render only the tiles whose counts changed since the last draw
+        for column in self._dirty:
+            self._tiles[column] = self._render_tile(column)
+        self._dirty.clear()
+
+        upp = self.units_per_pixel
+        size = utils.config.CHUNK_SIZE
+        left = cam_pos[0] + (area.left - center[0]) * upp
+        right = cam_pos[0] + (area.right - center[0]) * upp
+        top = cam_pos[2] + (area.top - center[1]) * upp
+        bottom = cam_pos[2] + (area.bottom - center[1]) * upp
+
+        previous_clip = target.get_clip()
+        target.set_clip(area)
+        for cx in range(math.floor(left / size), math.floor(right / size) + 1):
+            for cz in range(math.floor(top / size), math.floor(bottom / size) + 1):
+                tile = self._tiles.get((cx, cz))
+                if tile is None:
+                    continue
+                dest_x = center[0] + round((cx * size - cam_pos[0]) / upp)
+                dest_y = center[1] + round((cz * size - cam_pos[2]) / upp)
+                target.blit(tile, (dest_x, dest_y))
+        target.set_clip(previous_clip)
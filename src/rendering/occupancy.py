@@ -0,0 +1,76 @@
+"""Screen-space occupancy map for culling stars hidden behind other stars.
+
+The map is an 8-bit star layer the size of the screen: each byte is the
+brightness of the star covering that pixel (0 = empty). It is shared with a
+palette surface (`surface`), so stars are drawn by writing bytes and the
+whole layer is blitted once per frame, which costs much less than one
+`set_at`/`draw.circle` call per star once a couple of thousand stars are on
+screen (`PIXEL_CULL_MIN_STARS`).
+
+A star whose whole footprint is already lit is skipped. Radius 0 is a single
+pixel. Radius 1 is the 2x2 block pygame draws for `draw.circle(..., 1)`, up
+and to the left of the centre (sx-1..sx, sy-1..sy). Larger discs are
+rasterised with `draw.circle`. Only pixels that are really drawn count as
+covered, so a star is never culled while part of it would still be visible.
+
+With PIXEL_CULL_MERGE_BRIGHTNESS the light of a culled star is added to the
+pixels covering it. Adding is order independent, so stars need no depth sort.
+"""
+import pygame
+import utils.config
+from typing import List
+
+
+class OccupancyMap:
+    """8-bit star layer doubling as the per-pixel "covered" map."""
+
+    def __init__(self, width: int = None, height: int = None):
+        self.width = width if width is not None else utils.config.WIDTH
+        self.height = height if height is not None else utils.config.HEIGHT
+        # Brightness per pixel; draw_stars writes it directly for small stars
+        self.pixels = bytearray(self.width * self.height)
+        self._blank = bytes(self.width * self.height)
+        self.surface = pygame.image.frombuffer(self.pixels, (self.width, self.height), 'P')
+        # Palette index v is grey level v, and 0 is transparent
+        self.surface.set_palette([(v, v, v) for v in range(256)])
+        self.surface.set_colorkey(0)
+
+    def begin_frame(self) -> None:
+        self.pixels[:] = self._blank
+
+    def _footprint(self, sx: int, sy: int, radius: int) -> List[int]:
+        """Return the indices of the pixels pygame draws for the star, clipped to the screen."""
+        w = self.width
+        if radius <= 0:
+            return [sy * w + sx]
+        far = 0 if radius == 1 else radius
+        x0, y0 = max(0, sx - radius), max(0, sy - radius)
+        x1, y1 = min(w - 1, sx + far), min(self.height - 1, sy + far)
+        if radius == 1:
+            return [y * w + x for y in range(y0, y1 + 1) for x in range(x0, x1 + 1)]
+        # Larger discs: let pygame rasterise the disc on a scratch surface
+        disc = pygame.Surface((x1 - x0 + 1, y1 - y0 + 1), depth=8)
+        pygame.draw.circle(disc, 1, (sx - x0, sy - y0), radius)
+        return [(y0 + y) * w + x0 + x for y in range(y1 - y0 + 1) for x in range(x1 - x0 + 1)
+                if disc.get_at_mapped((x, y))]
+
+    def covered(self, sx: int, sy: int, radius: int) -> bool:
+        """Return True if every pixel of the star's footprint is already lit."""
+        pixels = self.pixels
+        return all(pixels[i] for i in self._footprint(sx, sy, radius))
+
+    def draw(self, sx: int, sy: int, radius: int, value: int) -> None:
+        """Draw a star of brightness `value`, keeping brighter (merged) pixels already there."""
+        pixels = self.pixels
+        for i in self._footprint(sx, sy, radius):
+            pixels[i] = max(pixels[i], value)
+
+    def brighten(self, sx: int, sy: int, radius: int, step: int) -> None:
+        """Add `step` to the star's footprint (the light of a culled star)."""
+        pixels = self.pixels
+        for i in self._footprint(sx, sy, radius):
+            pixels[i] = min(255, pixels[i] + step)
+
+    def blit(self, target: pygame.Surface) -> None:
+        """Blit the layer (empty pixels are transparent) onto `target`."""
+        target.blit(self.surface, (0, 0))
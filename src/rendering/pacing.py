@@ -0,0 +1,141 @@
+"""Frame pacing modes and frame timing instrumentation.
+
+Modes (`utils.config.FRAME_PACING`):
+- "uncapped": render as fast as possible
+- "capped": hold TARGET_FPS with `Clock.tick_busy_loop` (precise, but spins a core)
+- "vsync": let `display.flip` wait for the display refresh (see `rendering.window`)
+- "lowpower": sleep-based cap at TARGET_FPS, dropping to LOW_POWER_IDLE_FPS when there is no input
+
+Instrumentation: frame-interval jitter (measured between flips) and
+input-to-flip latency (from the input event's timestamp to the end of the
+`display.flip` of the frame that handled it).
+
+pygame 2.6 events carry no timestamp. The arrival time is then bounded by
+the previous event poll: an event read in this frame arrived after the
+events were last read, i.e. at the latest before the previous frame's work
+and this frame's pacing wait. The latency is then an upper-bound estimate
+that includes the time spent waiting in the queue, which is where the modes
+differ, and is reported as such.
+"""
+import math
+import time
+import pygame
+import utils.config
+import utils.logger
+from collections import deque
+from typing import Dict
+
+logger = utils.logger.get_logger()
+
+PACING_MODES = ("uncapped", "capped", "vsync", "lowpower")
+
+_INPUT_EVENTS = (pygame.KEYDOWN, pygame.KEYUP, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP, pygame.MOUSEMOTION)
+
+
+def _percentile(sorted_values, fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+class FramePacer:
+    """Paces frames according to the selected mode and measures the result."""
+
+    def __init__(self, clock: pygame.time.Clock, mode: str = None):
+        if mode is None:
+            mode = utils.config.FRAME_PACING
+        if mode not in PACING_MODES:
+            raise ValueError(f"Unknown frame pacing mode {mode!r}, expected one of {PACING_MODES}")
+        self.clock = clock
+        self.mode = mode
+        self.idle = False
+        self._last_activity = time.perf_counter()
+        self._pending_input = None  # perf_counter time of the oldest input not yet presented
+        self._last_poll = None  # Time the events were last read (end of the previous tick)
+        self._poll = time.perf_counter()
+        self.latency_estimated = False  # True once a latency came from the poll bound instead of a timestamp
+        self._last_flip = None
+        self._intervals = deque(maxlen=utils.config.PACING_SAMPLE_WINDOW)
+        self._latencies = deque(maxlen=utils.config.PACING_SAMPLE_WINDOW)
+        self._last_report = time.perf_counter()
+
+    def tick(self) -> float:
+        """Wait as the mode requires and return the frame delta in seconds."""
+        if self.mode == "capped":
+            ms = self.clock.tick_busy_loop(utils.config.TARGET_FPS)
+        elif self.mode == "lowpower":
+            self.idle = time.perf_counter() - self._last_activity > utils.config.LOW_POWER_IDLE_AFTER
+            fps = utils.config.LOW_POWER_IDLE_FPS if self.idle else utils.config.TARGET_FPS
+            ms = self.clock.tick(fps)
+        else:
+            # uncapped, or vsync where display.flip does the waiting
+            ms = self.clock.tick()
+        # The game loop reads events right after the wait
+        self._last_poll, self._poll = self._poll, time.perf_counter()
+        return ms / 1000.0
+
+    def mark_active(self) -> None:
+        """Note user activity that does not come as an event (e.g. held movement keys)."""
+        self._last_activity = time.perf_counter()
+
+    def note_event(self, event) -> None:
+        """Record an input event handled this frame."""
+        if event.type not in _INPUT_EVENTS:
+            return
+        now = time.perf_counter()
+        self._last_activity = now
+        timestamp = getattr(event, 'timestamp', None)
+        if timestamp is not None:
+            # SDL event timestamps share the pygame.time.get_ticks() time base (ms)
+            now -= max(0, pygame.time.get_ticks() - timestamp) / 1000.0
+        elif self._last_poll is not None:
+            # No timestamp: the event arrived after the previous poll at the earliest
+            now = self._last_poll
+            self.latency_estimated = True
+        if self._pending_input is None or now < self._pending_input:
+            self._pending_input = now
+
+    def frame_presented(self) -> None:
+        """Call right after `pygame.display.flip()`."""
+        now = time.perf_counter()
+        if self._last_flip is not None:
+            self._intervals.append(now - self._last_flip)
+        self._last_flip = now
+        if self._pending_input is not None:
+            self._latencies.append(now - self._pending_input)
+            self._pending_input = None
+        if now - self._last_report >= utils.config.PACING_REPORT_INTERVAL:
+            self._last_report = now
+            s = self.stats()
+            logger.info(
+                f"Frame pacing [{self.mode}{' idle' if self.idle else ''}]: interval={s['interval_ms']:.2f} ms, "
+                f"jitter={s['jitter_ms']:.2f} ms, p99 interval={s['interval_p99_ms']:.2f} ms, "
+                f"input latency{' (upper-bound estimate)' if s['latency_estimated'] else ''} "
+                f"mean={s['latency_ms']:.1f} ms p95={s['latency_p95_ms']:.1f} ms (n={s['latency_samples']})"
+            )
+
+    def stats(self) -> Dict:
+        """Return frame interval and input latency statistics (milliseconds)."""
+        intervals = sorted(self._intervals)
+        latencies = sorted(self._latencies)
+        mean = sum(intervals) / len(intervals) if intervals else 0.0
+        jitter = math.sqrt(sum((i - mean) ** 2 for i in intervals) / len(intervals)) if intervals else 0.0
+        return {
+            'mode': self.mode,
+            'idle': self.idle,
+            'interval_ms': mean * 1000.0,
+            'jitter_ms': jitter * 1000.0,
+            'interval_p99_ms': _percentile(intervals, 0.99) * 1000.0,
+            'latency_ms': (sum(latencies) / len(latencies) * 1000.0) if latencies else 0.0,
+            'latency_p95_ms': _percentile(latencies, 0.95) * 1000.0,
+            'latency_samples': len(latencies),
+            'latency_estimated': self.latency_estimated,
+        }
+
+    def hud_text(self) -> str:
+        """Return a short HUD line with the pacing mode, jitter and input latency."""
+        s = self.stats()
+        mode = f"{self.mode} (ocioso)" if self.idle else self.mode
+        # "<=" marks an upper-bound estimate (events without timestamps)
+        lat = "lat95<=" if s['latency_estimated'] else "lat95="
+        return f"Ritmo: {mode} jitter={s['jitter_ms']:.1f}ms {lat}{s['latency_p95_ms']:.1f}ms"
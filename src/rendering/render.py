@@ -48,6 +48,99 @@ def world_to_screen(px: float, py: float, pz: float, cam_pos: List[float], cam_r
         return (sx, sy)
     return None
 
+def draw_stars(screen: pygame.Surface, visible_stars: List[Tuple], cam_pos: List[float], cam_rot: List[float], selected_id: Optional[int] = None, occupancy=None) -> Tuple[int, int, Optional[Tuple[int, int]]]:
+    """Project and draw `visible_stars` (x, y, z, size, star_id) for the camera.
+
+    Stars beyond LOD_DISTANCE are drawn as a single pixel. When `occupancy`
+    (a `rendering.occupancy.OccupancyMap`) is given, stars are drawn into its
+    8-bit layer, those whose footprint is already lit are skipped, and the
+    layer is blitted once; with PIXEL_CULL_MERGE_BRIGHTNESS their light
+    brightens the pixels covering them. Views with fewer than
+    PIXEL_CULL_MIN_STARS stars on screen are drawn directly. The selected
+    star is never culled.
+
+    Returns (drawn_count, culled_count, selected_screen_pos).
+    """
+    # Same transform as world_to_screen, with the trigonometry hoisted out of the loop
+    sin_y, cos_y = math.sin(cam_rot[1]), math.cos(cam_rot[1])
+    sin_x, cos_x = math.sin(cam_rot[0]), math.cos(cam_rot[0])
+    scale = get_scale()
+    width, height = utils.config.WIDTH, utils.config.HEIGHT
+    lod_sq = utils.config.LOD_DISTANCE ** 2
+    camx, camy, camz = cam_pos[0], cam_pos[1], cam_pos[2]
+
+    projected = []
+    for sx, sy, sz, size, sid in visible_stars:
+        x = sx - camx
+        y = sy - camy
+        z = sz - camz
+        # Radius 0 means a single pixel (beyond LOD_DISTANCE)
+        radius = 0 if x * x + y * y + z * z > lod_sq else max(1, int(size))
+        x, z = x * cos_y - z * sin_y, x * sin_y + z * cos_y
+        y, z = y * cos_x - z * sin_x, y * sin_x + z * cos_x
+        if z <= 0:
+            continue
+        px = int(WIDTH_HALF + (x / z) * scale)
+        py = int(HEIGHT_HALF - (y / z) * scale)
+        if 0 <= px < width and 0 <= py < height:
+            projected.append((z, px, py, radius, sid))
+
+    culled = 0
+    selected_pos = None
+    white = (255, 255, 255)
+    merge = utils.config.PIXEL_CULL_MERGE_BRIGHTNESS
+    # The layer has a fixed cost (clear + blit) that only pays off with many stars on screen;
+    # merging changes how stars look, so it always uses the layer
+    if occupancy is None or (not merge and len(projected) < utils.config.PIXEL_CULL_MIN_STARS):
+        set_at, circle = screen.set_at, pygame.draw.circle
+        for _, px, py, radius, sid in projected:
+            if radius == 0:
+                set_at((px, py), white)
+            else:
+                circle(screen, white, (px, py), radius)
+            if sid == selected_id:
+                selected_pos = (px, py)
+        return len(projected), 0, selected_pos
+
+    value = utils.config.STAR_MERGE_BASE_BRIGHTNESS if merge else 255
+    step = utils.config.STAR_MERGE_BRIGHTNESS_STEP
+    occupancy.begin_frame()
+    pixels, w = occupancy.pixels, occupancy.width
+    for _, px, py, radius, sid in projected:
+        if sid == selected_id:
+            # Never culled: when covered, its pixels are already lit
+            selected_pos = (px, py)
+        # Single pixels and 2x2 blocks (every star with the default sizes) are handled inline
+        i = py * w + px
+        if radius == 0:
+            if pixels[i]:
+                culled += 1
+                if merge:
+                    pixels[i] = min(255, pixels[i] + step)
+            else:
+                pixels[i] = value
+        elif radius == 1 and px and py:
+            j = i - w
+            if pixels[i] and pixels[i - 1] and pixels[j] and pixels[j - 1]:
+                culled += 1
+                if merge:
+                    for k in (i, i - 1, j, j - 1):
+                        pixels[k] = min(255, pixels[k] + step)
+            elif merge:
+                for k in (i, i - 1, j, j - 1):
+                    if pixels[k] < value:
+                        pixels[k] = value
+            else:
+                pixels[i] = pixels[i - 1] = pixels[j] = pixels[j - 1] = 255
+        elif occupancy.covered(px, py, radius):
+            culled += 1
+            if merge:
+                occupancy.brighten(px, py, radius, step)
+        else:
+            occupancy.draw(px, py, radius, value)
+    occupancy.blit(screen)
+    return len(projected) - culled, culled, selected_pos
+
 def create_panel_surface(width: int, height: int, alpha: int = None) -> pygame.Surface:
     """Create and return an RGBA surface (panel) with default color and border.
 
@@ -104,13 +197,14 @@ def draw_arrow(screen: pygame.Surface, pos: Tuple[int, int]) -> None:
     # Highlight circle
     pygame.draw.circle(screen, arrow_color, pos, 12, 2)
 
-def draw_star_info(screen: pygame.Surface, star: Tuple[float, float, float, float, str]) -> None:
+def draw_star_info(screen: pygame.Surface, star: Tuple[float, float, float, float, str], details: Optional[dict] = None) -> None:
     """Display detailed information about the selected `star` in a panel.
 
-    `star` is a tuple (x, y, z, size, name).
+    `star` is a tuple (x, y, z, size, name); `details` is the dict returned by
+    `core.engine.get_star_details` (spectral class, temperature, planets).
     """
     panel_width = 280
-    panel_height = 160
+    panel_height = 220
     
     # Create panel
     panel = create_panel_surface(panel_width, panel_height)
@@ -128,19 +222,24 @@ def draw_star_info(screen: pygame.Surface, star: Tuple[float, float, float, floa
     info_lines = [
         f"Posição: ({star[0]:.1f}, {star[1]:.1f}, {star[2]:.1f})",
         f"Tamanho: {star[3]:.2f}",
-        f"Tipo: Estrela Classe G",
-        f"Distância: {math.sqrt(star[0]**2 + star[1]**2 + star[2]**2):.1f} u.l."
     ]
+    if details:
+        info_lines += [
+            f"Tipo: Estrela Classe {details['spectral_class']}",
+            f"Temperatura: {details['temperature_k']} K",
+            f"Planetas: {len(details['planets'])}",
+        ]
+    info_lines.append(f"Distância: {math.sqrt(star[0]**2 + star[1]**2 + star[2]**2):.1f} u.l.")
     
     y_offset = 45
     for i, line in enumerate(info_lines):
-        color = utils.config.UI_COLORS['text'] if i < 2 else utils.config.UI_COLORS['text']
+        color = utils.config.UI_COLORS['text']
         text_surface = font_normal.render(line, True, color)
         panel.blit(text_surface, (15, y_offset + i * 20))
     
-    # Status bar
-    status_y = y_offset + 80
-    pygame.draw.rect(panel, (60, 60, 80), (15, status_y, 250, 8))
+    # Status bar, in the star's colour when known
+    status_y = y_offset + len(info_lines) * 20 + 10
+    pygame.draw.rect(panel, details['color'] if details else (60, 60, 80), (15, status_y, 250, 8))
     pygame.draw.rect(panel, utils.config.UI_COLORS['success'], (15, status_y, 250, 8), 1)
     
     # Status text
@@ -203,12 +302,13 @@ def draw_hud_panel(screen: pygame.Surface, cam_pos: List[float], fps: float, uni
     # Position the panel
     screen.blit(panel, (20, 20))
 
-def draw_minimap(screen: pygame.Surface, cam_pos: List[float], visible_stars: List[Tuple], selected_star: Optional[Tuple] = None) -> None:
-    """Draw a minimap showing nearby stars relative to the camera.
+def draw_minimap(screen: pygame.Surface, cam_pos: List[float], density_layer, selected_star: Optional[Tuple] = None) -> None:
+    """Draw a top-down minimap of the loaded region around the camera.
 
-    `visible_stars` is a list of star tuples (x,y,z,size,name).
+    `density_layer` is a `rendering.minimap.MinimapDensityLayer` kept up to
+    date by the engine, so the cost does not depend on the number of stars.
     """
-    map_size = 150
+    map_size = utils.config.MINIMAP_SIZE
     map_x = utils.config.WIDTH - map_size - 20
     map_y = utils.config.HEIGHT - map_size - 20
     
@@ -219,24 +319,18 @@ def draw_minimap(screen: pygame.Surface, cam_pos: List[float], visible_stars: Li
     title = pygame.font.SysFont("monospace", 12, bold=True).render("MINIMAPA", True, utils.config.UI_COLORS['accent'])
     panel.blit(title, (10, 10))
     
-    # Draw stars on the minimap
+    # Blit the cached density tiles with the camera at the center
     map_center = map_size // 2
-    scale = map_size / 200  # Minimap scale
-    
-    for star in visible_stars[:50]:  # Limit to 50 stars on the minimap
-        # Calculate position relative to the camera
-        rel_x = (star[0] - cam_pos[0]) * scale
-        rel_z = (star[2] - cam_pos[2]) * scale
-        
-        # Convert to minimap coordinates
-        map_pos_x = int(map_center + rel_x)
-        map_pos_y = int(map_center + rel_z)
-        
-        # Check if inside the minimap area
-        if 20 <= map_pos_x < map_size - 20 and 30 <= map_pos_y < map_size - 20:
-            color = utils.config.UI_COLORS['warning'] if star == selected_star else utils.config.UI_COLORS['text']
-            size = 3 if star == selected_star else 1
-            pygame.draw.circle(panel, color, (map_pos_x, map_pos_y), size)
+    area = pygame.Rect(4, 26, map_size - 8, map_size - 30)
+    density_layer.blit(panel, area, (map_center, map_center), cam_pos)
+    
+    # Highlight the selected star
+    if selected_star:
+        upp = density_layer.units_per_pixel
+        map_pos_x = int(map_center + (selected_star[0] - cam_pos[0]) / upp)
+        map_pos_y = int(map_center + (selected_star[2] - cam_pos[2]) / upp)
+        if area.collidepoint(map_pos_x, map_pos_y):
+            pygame.draw.circle(panel, utils.config.UI_COLORS['warning'], (map_pos_x, map_pos_y), 3)
     
     # Draw camera position (center)
     pygame.draw.circle(panel, utils.config.UI_COLORS['accent'], (map_center, map_center), 4, 2)
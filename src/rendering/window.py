@@ -0,0 +1,36 @@
+"""Pygame window and input helpers for the interactive frontend."""
+import math
+import pygame
+import utils.config
+import utils.logger
+
+logger = utils.logger.get_logger()
+
+def initialize_pygame():
+    """Initialize Pygame and return the screen and clock."""
+    pygame.init()
+    size = (utils.config.WIDTH, utils.config.HEIGHT)
+    if utils.config.FRAME_PACING == "vsync":
+        # pygame only honours vsync with SCALED or OPENGL windows
+        try:
+            screen = pygame.display.set_mode(size, pygame.SCALED, vsync=1)
+        except pygame.error:
+            logger.warning("VSync is not available, falling back to an uncapped window")
+            screen = pygame.display.set_mode(size)
+    else:
+        screen = pygame.display.set_mode(size)
+    pygame.display.set_caption("Universe Engine - Procedural Space Explorer")
+    clock = pygame.time.Clock()
+    return screen, clock
+
+def handle_mouse_movement(cam_rot):
+    """Handle camera rotation using the mouse input."""
+    mx, my = pygame.mouse.get_pos()
+    center_x, center_y = utils.config.WIDTH // 2, utils.config.HEIGHT // 2
+    dx, dy = mx - center_x, my - center_y
+
+    if dx or dy:
+        cam_rot[1] += dx * utils.config.MOUSE_SENS
+        cam_rot[0] -= dy * utils.config.MOUSE_SENS
+        cam_rot[0] = max(-math.pi/2 + 0.01, min(math.pi/2 - 0.01, cam_rot[0]))
+        pygame.mouse.set_pos(center_x, center_y)
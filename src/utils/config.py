@@ -8,6 +8,13 @@ MOUSE_SENS = 0.0025
 GLOBAL_SEED = "lakentio2"  # Default seed - can be changed by user
 TARGET_FPS = 1000
 
+# Frame pacing: "uncapped", "capped" (precise busy-wait at TARGET_FPS), "vsync" or "lowpower"
+FRAME_PACING = "capped"
+LOW_POWER_IDLE_FPS = 15  # Frame rate in "lowpower" mode while there is no input
+LOW_POWER_IDLE_AFTER = 2.0  # Seconds without input before "lowpower" drops the frame rate
+PACING_SAMPLE_WINDOW = 240  # Frames kept for jitter/latency statistics
+PACING_REPORT_INTERVAL = 5.0  # Seconds between pacing statistics in the log
+
 # Configuration for custom seeds
 USE_CUSTOM_SEED = False  # Whether to use a custom seed
 CUSTOM_SEED = "Lakentio"  # User-provided custom seed
@@ -17,6 +24,33 @@ FRUSTUM_CULLING = False  # Disabled for performance
 MAX_VISIBLE_STARS = 1000  # Increased for debugging (show more stars)
 LOD_DISTANCE = 500.0  # High to not limit
 STAR_FADE_DISTANCE = 200.0  # High to not limit
+ORIGIN_REBASE_CHUNKS = 16  # Move the floating render origin once the camera is this many chunks away
+CHUNK_UPDATE_INTERVAL = 0.12  # Seconds between visible-star refreshes (~8-9 per second)
+PIXEL_OCCUPANCY_CULLING = False  # Skip stars whose pixels are already covered by nearer stars
+PIXEL_CULL_MERGE_BRIGHTNESS = False  # Add the culled star's light to the pixels covering it (always uses the star layer)
+PIXEL_CULL_MIN_STARS = 2000  # Fewer stars on screen than this are drawn directly (the star layer would cost more)
+STAR_MERGE_BASE_BRIGHTNESS = 190  # Star brightness (0-255) when merging is on and nothing was merged into it
+STAR_MERGE_BRIGHTNESS_STEP = 20  # Extra brightness per culled star merged into a drawn one
+CHUNK_GEN_BUDGET_MS = 4.0  # Time per frame for chunk planning, generation and star collection (None = no limit)
+
+# Adaptive quality (feedback controller that steers towards TARGET_FPS)
+ADAPTIVE_QUALITY = False  # Enable with --adaptive or here; set TARGET_FPS to the rate to hold
+# Quality ladder from cheapest to richest; the controller moves one step at a time
+QUALITY_LEVELS = [
+    {'max_visible_stars': 250, 'chunk_radius': 1, 'lod_distance': 150.0, 'chunk_update_interval': 0.30},
+    {'max_visible_stars': 500, 'chunk_radius': 1, 'lod_distance': 250.0, 'chunk_update_interval': 0.20},
+    {'max_visible_stars': 750, 'chunk_radius': 1, 'lod_distance': 350.0, 'chunk_update_interval': 0.15},
+    {'max_visible_stars': 1000, 'chunk_radius': 1, 'lod_distance': 500.0, 'chunk_update_interval': 0.12},
+    {'max_visible_stars': 2000, 'chunk_radius': 2, 'lod_distance': 800.0, 'chunk_update_interval': 0.12},
+    {'max_visible_stars': 4000, 'chunk_radius': 2, 'lod_distance': 1200.0, 'chunk_update_interval': 0.10},
+]
+QUALITY_START_LEVEL = 3  # Level matching the static defaults above
+QUALITY_FPS_TOLERANCE = 0.10  # Drop a level when frame work exceeds the frame budget (1 / TARGET_FPS) by this fraction
+QUALITY_UPGRADE_HEADROOM = 0.5  # Raise a level only while frame work uses less than this fraction of the budget
+QUALITY_DOWNGRADE_HOLD = 0.5  # Seconds over budget before dropping a level
+QUALITY_UPGRADE_HOLD = 2.0  # Seconds with spare headroom before raising a level
+QUALITY_COOLDOWN = 1.5  # Seconds to let a change settle before judging it
+QUALITY_UPGRADE_BACKOFF = 10.0  # Seconds a level stays locked after it failed to hold the target
 
 # UI/HUD settings (kept as-is)
 UI_SCALE = 3  # Interface scale
@@ -31,7 +65,17 @@ UI_COLORS = {
 UI_FONT_SIZE = 24
 UI_PANEL_ALPHA = 180  # Panel transparency (0-255)
 
+# Minimap (cached density layer over loaded chunks, seen from above)
+SHOW_MINIMAP = True
+MINIMAP_SIZE = 150  # Panel size in pixels
+MINIMAP_UNITS_PER_PIXEL = 4  # World units per minimap pixel; should divide CHUNK_SIZE
+
 # Logging / Debug
 DEBUG_LOG = True # Activate logs for depuration
 LOG_FILE = "universe_debug.log"
 LOG_LEVEL = "INFO"  # DEBUG, INFO, WARNING, ERROR
+LOG_FORMAT = "text"  # "text" or "json" (compact JSON lines in LOG_FILE)
+LOG_ASYNC = True  # Format and write logs on a background thread instead of the game loop
+LOG_QUEUE_SIZE = 10000  # Records buffered for the background thread; extra records are dropped
+LOG_RATE_LIMIT = 20  # Max INFO/DEBUG records per call site per window (0 = unlimited)
+LOG_RATE_WINDOW = 1.0  # Seconds
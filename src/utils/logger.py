@@ -1,11 +1,106 @@
+import atexit
+import json
 import logging
 import logging.handlers
 import os
+import queue
 import utils.config as config
 
-# Configure the central 'universe' logger
+
+class JsonLinesFormatter(logging.Formatter):
+    """Compact structured format: one JSON object per line."""
+
+    def format(self, record):
+        entry = {
+            't': round(record.created, 3),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+            'src': f"{record.module}:{record.lineno}",
+        }
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, separators=(',', ':'))
+
+
+class RateLimitFilter(logging.Filter):
+    """Let at most `limit` records per call site through every `window` seconds.
+
+    Warnings and errors are never limited. The first record let through after
+    a suppression gets a note with the number of dropped messages.
+    """
+
+    def __init__(self, limit: int, window: float):
+        super().__init__()
+        self.limit = limit
+        self.window = window
+        # call site -> [window_start, count, suppressed]
+        self._sites = {}
+        self.suppressed_total = 0
+
+    def filter(self, record):
+        if self.limit <= 0 or record.levelno >= logging.WARNING:
+            return True
+        site = (record.name, record.pathname, record.lineno)
+        now = record.created
+        state = self._sites.get(site)
+        if state is None or now - state[0] >= self.window:
+            suppressed = state[2] if state else 0
+            self._sites[site] = [now, 1, 0]
+            if suppressed:
+                record.msg = f"{record.getMessage()} (suppressed {suppressed} similar messages)"
+                record.args = None
+            return True
+        if state[1] < self.limit:
+            state[1] += 1
+            return True
+        state[2] += 1
+        self.suppressed_total += 1
+        return False
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that never blocks the caller: records are dropped when the queue is full.
+
+    Formatting is left to the listener thread; records stay in-process so they
+    do not need to be pre-formatted or made picklable.
+    """
+
+    def __init__(self, q):
+        super().__init__(q)
+        self.dropped = 0
+
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _Listener(logging.handlers.QueueListener):
+    def enqueue_sentinel(self):
+        # Wait for room so shutdown works even with a full queue
+        self.queue.put(self._sentinel, timeout=1.0)
+
+
+# The central 'universe' logger. Nothing is attached until `configure_logging()`
+# is called, so importing this module (or `core`) has no side effects.
 logger = logging.getLogger('universe')
-if not logger.handlers:
+_listener = None
+_queue_handler = None
+_rate_filter = None
+
+def configure_logging():
+    """Attach the handlers, listener thread and rate limiting from `utils.config`.
+
+    Called once by the entry points (`main()`, the CLIs). Later calls do nothing.
+    """
+    global _listener, _queue_handler, _rate_filter
+    if logger.handlers or _rate_filter is not None:
+        return
     level_name = getattr(config, 'LOG_LEVEL', 'DEBUG')
     level = getattr(logging, level_name.upper(), logging.DEBUG)
     logger.setLevel(level)
@@ -13,20 +108,74 @@ if not logger.handlers:
     formatter = logging.Formatter('%(asctime)s [%(levelname)s] %(name)s: %(message)s')
 
     if getattr(config, 'DEBUG_LOG', False):
+        handlers = []
+
         # Console handler
         ch = logging.StreamHandler()
         ch.setLevel(level)
         ch.setFormatter(formatter)
-        logger.addHandler(ch)
+        handlers.append(ch)
 
-        # File handler (rotating)
+        # File handler (rotating), plain text or JSON lines
         log_file = getattr(config, 'LOG_FILE', 'universe_debug.log')
         os.makedirs(os.path.dirname(log_file), exist_ok=True) if os.path.dirname(log_file) else None
         fh = logging.handlers.RotatingFileHandler(log_file, maxBytes=5 * 1024 * 1024, backupCount=3)
         fh.setLevel(level)
-        fh.setFormatter(formatter)
-        logger.addHandler(fh)
+        fh.setFormatter(JsonLinesFormatter() if getattr(config, 'LOG_FORMAT', 'text') == 'json' else formatter)
+        handlers.append(fh)
+
+        if getattr(config, 'LOG_ASYNC', True):
+            # Formatting, console output, file writes and rotation all happen on the listener thread
+            _queue_handler = NonBlockingQueueHandler(queue.Queue(maxsize=getattr(config, 'LOG_QUEUE_SIZE', 10000)))
+            _listener = _Listener(_queue_handler.queue, *handlers, respect_handler_level=True)
+            _listener.start()
+            atexit.register(shutdown_logging)
+            handlers = [_queue_handler]
+
+        for handler in handlers:
+            logger.addHandler(handler)
+
+    # Rate limiting runs once per record, on the caller's thread, before anything is queued
+    _rate_filter = RateLimitFilter(getattr(config, 'LOG_RATE_LIMIT', 0), getattr(config, 'LOG_RATE_WINDOW', 1.0))
+    logger.addFilter(_rate_filter)
+
+def _after_fork_in_child():
+    """Forked processes (e.g. export workers) do not inherit the listener thread.
+
+    Swap the queue handler for the listener's handlers so records are written
+    directly instead of piling up in a queue nobody reads.
+    """
+    global _listener, _queue_handler
+    if _listener is None:
+        return
+    logger.removeHandler(_queue_handler)
+    for handler in _listener.handlers:
+        logger.addHandler(handler)
+    _listener = None
+    _queue_handler = None
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
 
 # Expose function to get the logger if needed
 def get_logger():
     return logger
+
+def get_log_stats():
+    """Return counters for messages dropped by the queue or suppressed by rate limiting."""
+    return {
+        'async': _listener is not None,
+        'queued': _queue_handler.queue.qsize() if _queue_handler else 0,
+        'dropped': _queue_handler.dropped if _queue_handler else 0,
+        'suppressed': _rate_filter.suppressed_total if _rate_filter else 0,
+    }
+
+def shutdown_logging():
+    """Flush pending records and stop the background listener."""
+    global _listener
+    if _listener is not None:
+        try:
+            _listener.stop()
+        except queue.Full:
+            pass
+        _listener = None
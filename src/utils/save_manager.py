@@ -6,7 +6,7 @@ Usage:
 - `load_state(name_or_filename)` -> loads a save by full filename or by name (chooses the most recent match)
 - `delete_save(filename)` -> removes a save file
 
-Saved data should contain at least: `cam_pos`, `cam_rot`, `selected_star` and `seed`.
+Saved data should contain at least: `cam_pos`, `cam_rot`, `selected_star_id` and `seed`.
 """
 import os
 import json
@@ -0,0 +1,55 @@
+import itertools
+
+import pytest
+
+import core.engine as engine
+import utils.config
+
+
+KEYS = [(0, 0, 0), (1, -1, 0), (-5, 3, 12), (127, -128, 64), (-100000, 99999, -1), (2 ** 40, -(2 ** 40), 7)]
+
+
+@pytest.mark.parametrize("key", KEYS)
+def test_star_id_round_trip(key):
+    for index in (0, 1, engine.MAX_STARS_PER_CHUNK - 1):
+        assert engine.split_star_id(engine.star_id(key, index)) == (key, index)
+
+
+def test_star_ids_are_unique_near_origin():
+    keys = itertools.product(range(-3, 4), repeat=3)
+    ids = {engine.star_id(key, index) for key in keys for index in (0, engine.MAX_STARS_PER_CHUNK - 1)}
+    assert len(ids) == 7 ** 3 * 2
+
+
+@pytest.mark.parametrize("index", [-1, engine.MAX_STARS_PER_CHUNK, engine.MAX_STARS_PER_CHUNK + 1])
+def test_star_id_rejects_index_overflow(index):
+    with pytest.raises(ValueError):
+        engine.star_id((0, 0, 0), index)
+
+
+def test_generate_chunk_rejects_too_many_stars(monkeypatch):
+    monkeypatch.setattr(utils.config, 'STARS_PER_CHUNK', (1, engine.MAX_STARS_PER_CHUNK + 1))
+    with pytest.raises(ValueError):
+        engine.generate_chunk(0, 0, 0)
+
+
+@pytest.mark.parametrize("sid", [-1, "12", 1.5, True, [3]])
+def test_load_game_drops_invalid_star_id(monkeypatch, sid):
+    state = {'cam_pos': [0.0, 0.0, 0.0], 'cam_rot': [0.0, 0.0], 'selected_star_id': sid}
+    monkeypatch.setattr(engine.save_manager, 'load_state', lambda name: dict(state))
+    assert engine.load_game('hand_edited')['selected_star_id'] is None
+
+
+def test_load_game_keeps_valid_star_id(monkeypatch):
+    sid = engine.star_id((2, 0, -1), 0)
+    state = {'cam_pos': [0.0, 0.0, 0.0], 'cam_rot': [0.0, 0.0], 'selected_star_id': sid}
+    monkeypatch.setattr(engine.save_manager, 'load_state', lambda name: dict(state))
+    assert engine.load_game('ok')['selected_star_id'] == sid
+
+
+def test_load_game_drops_id_of_missing_star(monkeypatch):
+    # A valid encoding whose index is past the stars the chunk really has
+    sid = engine.star_id((0, 0, 0), engine.MAX_STARS_PER_CHUNK - 1)
+    state = {'cam_pos': [0.0, 0.0, 0.0], 'cam_rot': [0.0, 0.0], 'selected_star_id': sid}
+    monkeypatch.setattr(engine.save_manager, 'load_state', lambda name: dict(state))
+    assert engine.load_game('missing')['selected_star_id'] is None
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""Guard for the pygame-free core import path.
+
+Imports `core.engine` in fresh interpreters and fails if pygame gets pulled
+in, if the import has side effects (creates files or starts threads), or if
+it takes longer than the budget (best of several runs).
+
+Usage:
+    python tools/check_core_import.py [--budget-ms 150] [--runs 5]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+# Measured inside the child so interpreter start-up is not counted
+_CHILD = """
+import os, sys, threading, time
+threads = threading.active_count()
+t = time.perf_counter()
+import core.engine
+elapsed = time.perf_counter() - t
+print(elapsed * 1000.0, 'pygame' in sys.modules, threading.active_count() - threads, len(os.listdir('.')))
+"""
+
+def measure_once() -> tuple:
+    """Return (import ms, pygame imported, threads started, files created in the working directory)."""
+    env = dict(os.environ, PYTHONPATH=os.path.abspath(SRC_DIR))
+    # Run from an empty scratch directory so any file the import creates shows up
+    with tempfile.TemporaryDirectory() as cwd:
+        out = subprocess.run([sys.executable, '-c', _CHILD], env=env, cwd=cwd,
+                             capture_output=True, text=True, check=True).stdout.split()
+    return float(out[-4]), out[-3] == 'True', int(out[-2]), int(out[-1])
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Check that core.engine imports quickly and without pygame")
+    parser.add_argument('--budget-ms', type=float, default=150.0, help='Maximum allowed import time in milliseconds')
+    parser.add_argument('--runs', type=int, default=5, help='Number of fresh interpreters to measure')
+    args = parser.parse_args()
+
+    timings = []
+    for _ in range(args.runs):
+        elapsed_ms, has_pygame, threads, files = measure_once()
+        if has_pygame:
+            print("FAIL: importing core.engine imported pygame")
+            return 1
+        if threads:
+            print(f"FAIL: importing core.engine started {threads} thread(s)")
+            return 1
+        if files:
+            print(f"FAIL: importing core.engine created {files} file(s) in the working directory")
+            return 1
+        timings.append(elapsed_ms)
+
+    best = min(timings)
+    print(f"core.engine import: best={best:.1f} ms, worst={max(timings):.1f} ms (budget {args.budget_ms:.0f} ms)")
+    if best > args.budget_ms:
+        print("FAIL: import time over budget")
+        return 1
+    print("OK")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())